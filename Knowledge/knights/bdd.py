@@ -0,0 +1,321 @@
+from logic import *
+
+# Terminal nodes, which sit below every variable in the order
+FALSE = 0
+TRUE = 1
+TERMINAL_LEVEL = float("inf")
+
+
+def appearance_order(sentence):
+    """
+    Orders symbols by their first appearance in the sentence, which
+    keeps symbols mentioned together close together in the diagram.
+    """
+    order = dict()
+    stack = [sentence]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Symbol):
+            order.setdefault(node.name, len(order))
+        elif isinstance(node, Not):
+            stack.append(node.operand)
+        elif isinstance(node, And):
+            stack.extend(reversed(node.conjuncts))
+        elif isinstance(node, Or):
+            stack.extend(reversed(node.disjuncts))
+        elif isinstance(node, Implication):
+            stack.extend([node.consequent, node.antecedent])
+        elif isinstance(node, Biconditional):
+            stack.extend([node.right, node.left])
+    return list(order)
+
+
+def sorted_order(sentence):
+    """Orders symbols alphabetically by name."""
+    return sorted(sentence.symbols())
+
+
+def frequency_order(sentence):
+    """
+    Orders symbols by how often they occur, most frequent first, so the
+    symbols constraining the most of the sentence are decided early.
+    """
+    first = appearance_order(sentence)
+    counts = {name: 0 for name in first}
+    stack = [sentence]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Symbol):
+            counts[node.name] += 1
+        elif isinstance(node, Not):
+            stack.append(node.operand)
+        elif isinstance(node, And):
+            stack.extend(node.conjuncts)
+        elif isinstance(node, Or):
+            stack.extend(node.disjuncts)
+        elif isinstance(node, Implication):
+            stack.extend([node.antecedent, node.consequent])
+        elif isinstance(node, Biconditional):
+            stack.extend([node.left, node.right])
+    return sorted(first, key=lambda name: -counts[name])
+
+
+ORDERINGS = {
+    "appearance": appearance_order,
+    "sorted": sorted_order,
+    "frequency": frequency_order,
+}
+
+
+class BDD():
+    """
+    Manager for reduced ordered binary decision diagrams.
+
+    Nodes are integers indexing into parallel lists of levels, low
+    children (variable false) and high children (variable true).
+    The unique table guarantees each (level, low, high) triple exists
+    once, so equal functions are always the same node, and the
+    operation cache remembers every `ite` result.
+    """
+
+    def __init__(self, order=()):
+        self.order = []
+        self.levels = dict()
+        self.level = [TERMINAL_LEVEL, TERMINAL_LEVEL]
+        self.low = [FALSE, TRUE]
+        self.high = [FALSE, TRUE]
+        self.unique = dict()
+        self.cache = dict()
+        for name in order:
+            self.add_variable(name)
+
+    def add_variable(self, name):
+        """
+        Adds a variable below every existing one, so nodes that were
+        already built keep a valid order.
+        """
+        if name not in self.levels:
+            self.levels[name] = len(self.order)
+            self.order.append(name)
+        return self.levels[name]
+
+    def node(self, level, low, high):
+        """Returns the node for `level ? high : low`, reusing equal nodes."""
+        if low == high:
+            return low
+        key = (level, low, high)
+        node = self.unique.get(key)
+        if node is None:
+            node = len(self.level)
+            self.level.append(level)
+            self.low.append(low)
+            self.high.append(high)
+            self.unique[key] = node
+        return node
+
+    def variable(self, name):
+        """Returns the node for a single variable."""
+        return self.node(self.add_variable(name), FALSE, TRUE)
+
+    def ite(self, f, g, h):
+        """Returns the node for `if f then g else h`."""
+        # Work through calls with an explicit stack instead of recursion,
+        # since a diagram can be as deep as there are variables. An
+        # entry (f, g, h, None) is a call still to make, and an entry
+        # (f, g, h, top) joins the results of its two cofactor calls.
+        results = []
+        stack = [(f, g, h, None)]
+        while stack:
+            f, g, h, top = stack.pop()
+            if top is not None:
+                high = results.pop()
+                low = results.pop()
+                result = self.node(top, low, high)
+                self.cache[f, g, h] = result
+                results.append(result)
+                continue
+
+            result = self.shortcut(f, g, h)
+            if result is not None:
+                results.append(result)
+                continue
+
+            # Split on the topmost variable of the three operands
+            top = min(self.level[f], self.level[g], self.level[h])
+            f0, f1 = self.cofactors(f, top)
+            g0, g1 = self.cofactors(g, top)
+            h0, h1 = self.cofactors(h, top)
+            stack.append((f, g, h, top))
+            stack.append((f1, g1, h1, None))
+            stack.append((f0, g0, h0, None))
+        return results.pop()
+
+    def shortcut(self, f, g, h):
+        """
+        Returns the node for `if f then g else h` when it is trivial or
+        cached, and None otherwise.
+        """
+        if f == TRUE:
+            return g
+        if f == FALSE:
+            return h
+        if g == h:
+            return g
+        if g == TRUE and h == FALSE:
+            return f
+        return self.cache.get((f, g, h))
+
+    def cofactors(self, f, level):
+        """Returns `f` with the variable at `level` set false and true."""
+        if self.level[f] != level:
+            return f, f
+        return self.low[f], self.high[f]
+
+    def negate(self, f):
+        return self.ite(f, FALSE, TRUE)
+
+    def build(self, sentence):
+        """Returns the node representing a logical sentence."""
+        # Post-order traversal with an explicit stack instead of
+        # recursion, leaving each sub-sentence's node on `results`
+        results = []
+        stack = [(sentence, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if isinstance(node, Symbol):
+                results.append(self.variable(node.name))
+                continue
+            operands = self.operands(node)
+            if not expanded:
+                stack.append((node, True))
+                for operand in reversed(operands):
+                    stack.append((operand, False))
+                continue
+
+            built = results[len(results) - len(operands):]
+            del results[len(results) - len(operands):]
+            if isinstance(node, Not):
+                result = self.negate(built[0])
+            elif isinstance(node, And):
+                result = TRUE
+                for conjunct in built:
+                    result = self.ite(result, conjunct, FALSE)
+            elif isinstance(node, Or):
+                result = FALSE
+                for disjunct in built:
+                    result = self.ite(result, TRUE, disjunct)
+            elif isinstance(node, Implication):
+                result = self.ite(built[0], built[1], TRUE)
+            else:
+                left, right = built
+                result = self.ite(left, right, self.negate(right))
+            results.append(result)
+        return results.pop()
+
+    @staticmethod
+    def operands(sentence):
+        """Returns the list of sub-sentences of a compound sentence."""
+        if isinstance(sentence, Not):
+            return [sentence.operand]
+        if isinstance(sentence, And):
+            return sentence.conjuncts
+        if isinstance(sentence, Or):
+            return sentence.disjuncts
+        if isinstance(sentence, Implication):
+            return [sentence.antecedent, sentence.consequent]
+        if isinstance(sentence, Biconditional):
+            return [sentence.left, sentence.right]
+        raise TypeError(f"cannot compile {type(sentence).__name__}")
+
+    def count(self, f):
+        """
+        Returns the number of assignments to all variables in the
+        order that make `f` true.
+        """
+        n = len(self.order)
+        counts = {FALSE: 0, TRUE: 1}
+
+        def level(u):
+            return min(self.level[u], n)
+
+        # Visit nodes bottom-up with an explicit stack
+        stack = [f]
+        while stack:
+            u = stack[-1]
+            if u in counts:
+                stack.pop()
+                continue
+            low, high = self.low[u], self.high[u]
+            pending = [v for v in (low, high) if v not in counts]
+            if pending:
+                stack.extend(pending)
+                continue
+            stack.pop()
+
+            # Variables skipped between a node and its child are free
+            counts[u] = (
+                (counts[low] << (level(low) - level(u) - 1))
+                + (counts[high] << (level(high) - level(u) - 1))
+            )
+        return counts[f] << level(f)
+
+    def size(self, f):
+        """Returns the number of nodes reachable from `f`."""
+        seen = set()
+        stack = [f]
+        while stack:
+            u = stack.pop()
+            if u in seen:
+                continue
+            seen.add(u)
+            if u > TRUE:
+                stack.extend([self.low[u], self.high[u]])
+        return len(seen)
+
+
+class CompiledKnowledge():
+    """
+    A knowledge base compiled once into a BDD, so that each query
+    costs time polynomial in the size of the diagrams rather than a
+    fresh search over every model.
+    """
+
+    def __init__(self, knowledge, order="appearance"):
+        if isinstance(order, str):
+            order = ORDERINGS[order]
+        if callable(order):
+            order = order(knowledge)
+        self.bdd = BDD(order)
+        self.root = self.bdd.build(knowledge)
+        self.symbols = knowledge.symbols() | set(self.bdd.order)
+
+    def entails(self, query):
+        """Checks if the knowledge base entails query."""
+        q = self.bdd.build(query)
+        return self.bdd.ite(self.root, q, TRUE) == TRUE
+
+    def is_consistent(self):
+        """Checks if the knowledge base has at least one model."""
+        return self.root != FALSE
+
+    def count_models(self):
+        """Returns the number of models of the knowledge base over
+        its own symbols."""
+        # Queries may have added variables the knowledge base ignores
+        extra = len(self.bdd.order) - len(self.symbols)
+        return self.bdd.count(self.root) >> extra
+
+    def size(self):
+        """Returns the number of nodes in the compiled knowledge base."""
+        return self.bdd.size(self.root)
+
+
+def compile(knowledge, order="appearance"):
+    """
+    Compiles a knowledge base into a BDD for repeated queries.
+
+    `order` picks the variable ordering: the name of a heuristic in
+    `ORDERINGS`, a function from the sentence to a list of symbol names,
+    or that list itself.
+    """
+    return CompiledKnowledge(knowledge, order)
@@ -0,0 +1,76 @@
+import os
+import random
+import sys
+import time
+
+from logic import *
+
+SIZES = [4, 6, 8, 10, 12]
+
+
+def main():
+    sizes = [int(n) for n in sys.argv[1:]] or SIZES
+    cpus = os.cpu_count() or 1
+    process_counts = [p for p in (1, 2, 4, 8, 16) if p <= cpus] or [1]
+
+    print("chars  symbols  processes  serial(s)  parallel(s)  "
+          "speedup  efficiency")
+    for n in sizes:
+        knowledge, symbols = scaled_puzzle(n)
+        serial = time_queries(model_check, knowledge, symbols)
+        for processes in process_counts:
+            # One pool per knowledge base, so that the timing measures
+            # partitioning rather than starting processes for each query
+            with ParallelModelChecker(knowledge, processes) as checker:
+                parallel = time_queries(
+                    lambda kb, query: checker.check(query),
+                    knowledge, symbols
+                )
+            speedup = serial / parallel
+            print(f"{n:5}  {len(symbols):7}  {processes:9}  "
+                  f"{serial:9.3f}  {parallel:11.3f}  "
+                  f"{speedup:7.2f}  {speedup / processes:10.2f}")
+
+
+def scaled_puzzle(n, seed=0):
+    """
+    Builds a knights and knaves puzzle with `n` characters, where every
+    character makes a random statement about two other characters.
+    Returns the knowledge base and the list of symbols to query.
+    """
+    rng = random.Random(seed)
+    knights = [Symbol(f"{i} is a Knight") for i in range(n)]
+    knaves = [Symbol(f"{i} is a Knave") for i in range(n)]
+
+    knowledge = And()
+    for i in range(n):
+        # Every character is exactly one of a knight or a knave
+        knowledge.add(Or(knights[i], knaves[i]))
+        knowledge.add(Not(And(knights[i], knaves[i])))
+
+    for i in range(n):
+        others = [j for j in range(n) if j != i] or [i]
+        a, b = rng.choice(others), rng.choice(others)
+        statement = rng.choice([
+            And(knaves[a], knaves[b]),
+            Or(knights[a], knaves[b]),
+            Biconditional(knights[a], knights[b]),
+            Not(Biconditional(knights[a], knights[b])),
+            Implication(knights[a], knaves[b]),
+        ])
+        knowledge.add(Biconditional(knights[i], statement))
+        knowledge.add(Biconditional(knaves[i], Not(statement)))
+
+    return knowledge, knights + knaves
+
+
+def time_queries(check, knowledge, symbols):
+    """Times how long it takes `check` to query every symbol."""
+    start = time.perf_counter()
+    for symbol in symbols:
+        check(knowledge, symbol)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    main()
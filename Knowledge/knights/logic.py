@@ -1,4 +1,6 @@
 import itertools
+import multiprocessing
+import os
 
 
 class Sentence():
@@ -7,6 +9,14 @@ class Sentence():
         """Evaluates the logical sentence."""
         raise Exception("nothing to evaluate")
 
+    def evaluate_partial(self, model):
+        """
+        Evaluates the logical sentence under a partial model.
+        Returns True or False if the assigned symbols decide the
+        sentence, or None if its value is still unknown.
+        """
+        raise Exception("nothing to evaluate")
+
     def formula(self):
         """Returns string formula representing logical sentence."""
         return ""
@@ -62,6 +72,9 @@ class Symbol(Sentence):
         except KeyError:
             raise Exception(f"variable {self.name} not in model")
 
+    def evaluate_partial(self, model):
+        return model.get(self.name)
+
     def formula(self):
         return self.name
 
@@ -86,6 +99,10 @@ class Not(Sentence):
     def evaluate(self, model):
         return not self.operand.evaluate(model)
 
+    def evaluate_partial(self, model):
+        value = self.operand.evaluate_partial(model)
+        return None if value is None else not value
+
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
@@ -120,6 +137,17 @@ class And(Sentence):
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
 
+    def evaluate_partial(self, model):
+        # A single false conjunct decides the whole conjunction
+        result = True
+        for conjunct in self.conjuncts:
+            value = conjunct.evaluate_partial(model)
+            if value is False:
+                return False
+            if value is None:
+                result = None
+        return result
+
     def formula(self):
         if len(self.conjuncts) == 1:
             return self.conjuncts[0].formula()
@@ -127,7 +155,9 @@ class And(Sentence):
                            for conjunct in self.conjuncts])
 
     def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+        return set().union(
+            *[conjunct.symbols() for conjunct in self.conjuncts]
+        )
 
 
 class Or(Sentence):
@@ -151,6 +181,17 @@ class Or(Sentence):
     def evaluate(self, model):
         return any(disjunct.evaluate(model) for disjunct in self.disjuncts)
 
+    def evaluate_partial(self, model):
+        # A single true disjunct decides the whole disjunction
+        result = False
+        for disjunct in self.disjuncts:
+            value = disjunct.evaluate_partial(model)
+            if value is True:
+                return True
+            if value is None:
+                result = None
+        return result
+
     def formula(self):
         if len(self.disjuncts) == 1:
             return self.disjuncts[0].formula()
@@ -158,7 +199,9 @@ class Or(Sentence):
                             for disjunct in self.disjuncts])
 
     def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+        return set().union(
+            *[disjunct.symbols() for disjunct in self.disjuncts]
+        )
 
 
 class Implication(Sentence):
@@ -183,6 +226,17 @@ class Implication(Sentence):
         return ((not self.antecedent.evaluate(model))
                 or self.consequent.evaluate(model))
 
+    def evaluate_partial(self, model):
+        antecedent = self.antecedent.evaluate_partial(model)
+        if antecedent is False:
+            return True
+        consequent = self.consequent.evaluate_partial(model)
+        if consequent is True:
+            return True
+        if antecedent is None or consequent is None:
+            return None
+        return False
+
     def formula(self):
         antecedent = Sentence.parenthesize(self.antecedent.formula())
         consequent = Sentence.parenthesize(self.consequent.formula())
@@ -216,48 +270,214 @@ class Biconditional(Sentence):
                 or (not self.left.evaluate(model)
                     and not self.right.evaluate(model)))
 
+    def evaluate_partial(self, model):
+        left = self.left.evaluate_partial(model)
+        if left is None:
+            return None
+        right = self.right.evaluate_partial(model)
+        if right is None:
+            return None
+        return left == right
+
     def formula(self):
-        left = Sentence.parenthesize(str(self.left))
-        right = Sentence.parenthesize(str(self.right))
+        left = Sentence.parenthesize(self.left.formula())
+        right = Sentence.parenthesize(self.right.formula())
         return f"{left} <=> {right}"
 
     def symbols(self):
         return set.union(self.left.symbols(), self.right.symbols())
 
 
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
-
-    def check_all(knowledge, query, symbols, model):
-        """Checks if knowledge base entails query, given a particular model."""
-
-        # If model has an assignment for each symbol
-        if not symbols:
-
-            # If knowledge base is true in model, then query must also be true
-            if knowledge.evaluate(model):
-                return query.evaluate(model)
-            return True
-        else:
-
-            # Choose one of the remaining unused symbols
-            remaining = symbols.copy()
-            p = remaining.pop()
-
-            # Create a model where the symbol is true
-            model_true = model.copy()
-            model_true[p] = True
-
-            # Create a model where the symbol is false
-            model_false = model.copy()
-            model_false[p] = False
-
-            # Ensure entailment holds in both models
-            return (check_all(knowledge, query, remaining, model_true) and
-                    check_all(knowledge, query, remaining, model_false))
+def check_all(knowledge, query, symbols, model, trail, stats,
+              cancelled=None):
+    """
+    Checks if knowledge base entails query in every extension of the
+    partial `model` over the remaining `symbols`.
+
+    Symbols are assigned in place and recorded on `trail`, so
+    backtracking undoes assignments instead of copying the model.
+
+    If `cancelled` is given, it is called every CANCEL_INTERVAL nodes,
+    and once it returns True the search stops and returns None.
+    """
+    stats["nodes"] += 1
+    if (cancelled is not None and stats["nodes"] % CANCEL_INTERVAL == 0
+            and cancelled()):
+        return None
+
+    # Every extension of a model where the knowledge base is already
+    # false satisfies the entailment, so the subtree can be pruned
+    kb = knowledge.evaluate_partial(model)
+    if kb is False:
+        stats["pruned"] += 1
+        return True
+
+    # If the query is already true, it is true in every model of the
+    # knowledge base below this point. If the knowledge base is already
+    # true, the query's value (when known) decides the entailment.
+    value = query.evaluate_partial(model)
+    if value is True or (kb is True and value is False):
+        stats["decided"] += 1
+        return value
+
+    # Choose the next unused symbol
+    p = symbols[len(trail)]
+    trail.append(p)
+
+    # Ensure entailment holds with the symbol both true and false
+    model[p] = True
+    entailed = check_all(knowledge, query, symbols, model, trail, stats,
+                         cancelled)
+    if entailed:
+        model[p] = False
+        entailed = check_all(knowledge, query, symbols, model, trail,
+                             stats, cancelled)
+
+    # Undo the assignment before returning to the caller
+    del model[trail.pop()]
+    return entailed
+
+
+def model_check(knowledge, query, stats=None):
+    """
+    Checks if knowledge base entails query.
+
+    If `stats` is a dictionary, it is updated with the number of
+    enumeration `nodes` visited, subtrees `pruned` because the knowledge
+    base was false, and subtrees `decided` early by the query.
+    """
+    if stats is None:
+        stats = dict()
+    for key in ("nodes", "pruned", "decided"):
+        stats.setdefault(key, 0)
 
     # Get all symbols in both knowledge and query
-    symbols = set.union(knowledge.symbols(), query.symbols())
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
 
     # Check that knowledge entails query
-    return check_all(knowledge, query, symbols, dict())
+    return check_all(knowledge, query, symbols, dict(), list(), stats)
+
+
+# Nodes visited between checks for cancellation by check_all
+CANCEL_INTERVAL = 1000
+
+# Knowledge base shared by model checking workers, and an event set
+# once a counter-model is found so that every sub-problem stops
+worker_knowledge = None
+worker_cancelled = None
+
+
+def init_worker(knowledge, cancelled):
+    """Stores the knowledge base in a worker process once, not per task."""
+    global worker_knowledge, worker_cancelled
+    worker_knowledge = knowledge
+    worker_cancelled = cancelled
+
+
+def check_partition(task):
+    """
+    Checks entailment of `query` in the sub-problem where the first
+    `symbols` are fixed to the truth values in `prefix`.
+    Returns the result along with that sub-problem's statistics. A
+    sub-problem cancelled because another found a counter-model
+    counts as entailed, as the query's answer is already settled.
+    """
+    query, symbols, prefix = task
+    stats = {"nodes": 0, "pruned": 0, "decided": 0}
+    if worker_cancelled.is_set():
+        return True, stats
+    trail = list(symbols[:len(prefix)])
+    model = dict(zip(trail, prefix))
+    entailed = check_all(worker_knowledge, query, symbols, model, trail,
+                         stats, worker_cancelled.is_set)
+    return entailed is not False, stats
+
+
+class ParallelModelChecker():
+    """
+    Pool of processes that checks queries against one knowledge base.
+
+    The knowledge base is sent to each process once, when the pool
+    starts, and the pool is kept across queries, so only the first
+    query pays for starting processes. Use as a context manager, or
+    call `close` when done.
+    """
+
+    def __init__(self, knowledge, processes=None):
+        if processes is None:
+            processes = os.cpu_count() or 1
+        self.knowledge = knowledge
+        self.processes = processes
+        self.cancelled = multiprocessing.Event()
+        self.pool = multiprocessing.Pool(
+            processes, initializer=init_worker,
+            initargs=(knowledge, self.cancelled)
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.pool.terminate()
+        self.pool.join()
+
+    def check(self, query, k=None, stats=None):
+        """
+        Checks if the knowledge base entails query.
+
+        The first `k` symbols are fixed to every combination of truth
+        values, giving 2^k independent sub-problems. By default `k` is
+        chosen so that each process gets a few sub-problems to balance
+        uneven subtrees. As soon as any sub-problem finds a
+        counter-model, the sub-problems not yet started are skipped
+        and the running ones stop within CANCEL_INTERVAL nodes.
+        """
+        if stats is None:
+            stats = dict()
+        for key in ("nodes", "pruned", "decided"):
+            stats.setdefault(key, 0)
+
+        symbols = sorted(set.union(self.knowledge.symbols(),
+                                   query.symbols()))
+        if k is None:
+            k = (4 * self.processes - 1).bit_length()
+        k = max(0, min(k, len(symbols)))
+        tasks = (
+            (query, symbols, prefix)
+            for prefix in itertools.product([True, False], repeat=k)
+        )
+
+        entailed = True
+        self.cancelled.clear()
+        # Every result is collected, even after a counter-model, so that
+        # no task of this query is still running when the next starts
+        for result, partition_stats in self.pool.imap_unordered(
+            check_partition, tasks
+        ):
+            for key in partition_stats:
+                stats[key] += partition_stats[key]
+            if entailed and not result:
+                entailed = False
+                self.cancelled.set()
+        return entailed
+
+
+def model_check_parallel(knowledge, query, k=None, processes=None,
+                         stats=None, checker=None):
+    """
+    Checks if knowledge base entails query using a pool of processes.
+    See `ParallelModelChecker.check` for `k` and `stats`.
+
+    Pass a `ParallelModelChecker` for `knowledge` as `checker` to reuse
+    its processes; otherwise a pool is started for this query alone.
+    """
+    if checker is not None:
+        if checker.knowledge is not knowledge:
+            raise ValueError("checker was started for another knowledge "
+                             "base")
+        return checker.check(query, k, stats)
+    with ParallelModelChecker(knowledge, processes) as checker:
+        return checker.check(query, k, stats)
@@ -0,0 +1,307 @@
+import re
+
+from logic import *
+
+# Binding strength of each operator in formula syntax
+PRECEDENCE = {"<=>": 1, "=>": 2, "∨": 3, "∧": 4, "¬": 5}
+RIGHT_ASSOCIATIVE = {"<=>", "=>", "¬"}
+TOKENS = re.compile(r"(<=>|=>|¬|∧|∨|\(|\))")
+
+# Opcodes of the binary format, a postfix program over a stack of sentences
+MAGIC = b"KBS1"
+SYMBOL = 0
+NOT = 1
+AND = 2
+OR = 3
+IMPLICATION = 4
+BICONDITIONAL = 5
+REF = 6
+
+
+def tokenize(text):
+    """
+    Splits a formula into operators, parentheses and symbol names.
+    Symbol names may contain spaces, like "A is a Knight".
+    """
+    for token in TOKENS.split(text):
+        token = token.strip()
+        if token:
+            yield token
+
+
+def parse_formula(text):
+    """
+    Parses a string in the syntax produced by `Sentence.formula()`
+    into a sentence.
+
+    Uses an explicit operator stack rather than recursion, so deeply
+    nested formulas cannot hit the recursion limit. Chains like
+    `a ∧ b ∧ c` become a single `And`, while parenthesized groups
+    keep their own node so formulas round-trip.
+    """
+    operands = []
+    operators = []
+
+    # Conjunctions and disjunctions that a following operator of the
+    # same kind may still extend, because no parenthesis has closed them
+    open_chains = set()
+
+    def reduce():
+        operator = operators.pop()
+        if operator == "¬":
+            operands.append(Not(operands.pop()))
+            return
+        right = operands.pop()
+        left = operands.pop()
+        if operator in ("∧", "∨"):
+            kind = And if operator == "∧" else Or
+            if isinstance(left, kind) and id(left) in open_chains:
+                chain = left.conjuncts if kind is And else left.disjuncts
+                chain.append(right)
+                operands.append(left)
+                return
+            node = kind(left, right)
+            open_chains.add(id(node))
+        elif operator == "=>":
+            node = Implication(left, right)
+        else:
+            node = Biconditional(left, right)
+        operands.append(node)
+
+    expect_operand = True
+    for token in tokenize(text):
+        if token == "(" or token == "¬":
+            if not expect_operand:
+                raise ValueError(f"unexpected {token!r} in formula")
+            operators.append(token)
+        elif token == ")":
+            if expect_operand:
+                raise ValueError("unexpected ')' in formula")
+            while operators and operators[-1] != "(":
+                reduce()
+            if not operators:
+                raise ValueError("unbalanced parentheses in formula")
+            operators.pop()
+            open_chains.discard(id(operands[-1]))
+        elif token in PRECEDENCE:
+            if expect_operand:
+                raise ValueError(f"missing operand before {token!r}")
+            while operators and operators[-1] != "(" and (
+                PRECEDENCE[operators[-1]] > PRECEDENCE[token]
+                or (PRECEDENCE[operators[-1]] == PRECEDENCE[token]
+                    and token not in RIGHT_ASSOCIATIVE)
+            ):
+                reduce()
+            operators.append(token)
+            expect_operand = True
+        else:
+            if not expect_operand:
+                raise ValueError(f"unexpected symbol {token!r} in formula")
+            operands.append(Symbol(token))
+            expect_operand = False
+
+    if expect_operand:
+        raise ValueError("formula ends without an operand")
+    while operators:
+        if operators[-1] == "(":
+            raise ValueError("unbalanced parentheses in formula")
+        reduce()
+    return operands[0]
+
+
+def parse_dimacs(text, names=None):
+    """
+    Parses a CNF formula in DIMACS format into an `And` of `Or` clauses.
+
+    Variable `v` becomes `Symbol(names[v])` if a `names` mapping is given,
+    otherwise `Symbol(str(v))`. Parsing stops at a `%` line, which
+    SATLIB files put before a trailing lone `0`.
+    """
+    symbols = dict()
+    clauses = []
+    clause = []
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith("%"):
+            break
+        if not line or line[0] == "c":
+            continue
+        if line[0] == "p":
+            if line.split()[1:2] != ["cnf"]:
+                raise ValueError(f"unsupported DIMACS problem line {line!r}")
+            continue
+        for literal in line.split():
+            literal = int(literal)
+            if literal == 0:
+                # A bare 0 ends no clause, rather than an empty one
+                # that would make the formula unsatisfiable
+                if clause:
+                    clauses.append(Or(*clause))
+                    clause = []
+                continue
+            variable = abs(literal)
+            if variable not in symbols:
+                name = names[variable] if names else str(variable)
+                symbols[variable] = Symbol(name)
+            symbol = symbols[variable]
+            clause.append(symbol if literal > 0 else Not(symbol))
+    if clause:
+        clauses.append(Or(*clause))
+    return And(*clauses)
+
+
+def children(sentence):
+    """Returns the list of sub-sentences of a sentence."""
+    if isinstance(sentence, Symbol):
+        return []
+    if isinstance(sentence, Not):
+        return [sentence.operand]
+    if isinstance(sentence, And):
+        return sentence.conjuncts
+    if isinstance(sentence, Or):
+        return sentence.disjuncts
+    if isinstance(sentence, Implication):
+        return [sentence.antecedent, sentence.consequent]
+    if isinstance(sentence, Biconditional):
+        return [sentence.left, sentence.right]
+    raise TypeError(f"cannot serialize {type(sentence).__name__}")
+
+
+def write_varint(out, value):
+    """Appends a non-negative integer to `out` in 7-bit groups."""
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data, position):
+    """Reads an integer written by `write_varint`, returns it and the
+    position just after it."""
+    value = 0
+    shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+
+
+def dumps(sentence):
+    """
+    Serializes a sentence to bytes.
+
+    The format is a symbol table followed by a postfix program: each
+    instruction builds one node from the nodes on top of a stack.
+    Sub-sentences shared between several parents are written once
+    and referenced afterwards.
+    """
+    names = dict()
+    numbers = dict()
+    program = bytearray()
+    count = 0
+
+    # Post-order traversal with an explicit stack instead of recursion
+    stack = [(sentence, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if id(node) in numbers:
+            program.append(REF)
+            write_varint(program, numbers[id(node)])
+            count += 1
+            continue
+        subsentences = children(node)
+        if subsentences and not expanded:
+            stack.append((node, True))
+            for subsentence in reversed(subsentences):
+                stack.append((subsentence, False))
+            continue
+
+        if isinstance(node, Symbol):
+            program.append(SYMBOL)
+            write_varint(program, names.setdefault(node.name, len(names)))
+        elif isinstance(node, Not):
+            program.append(NOT)
+        elif isinstance(node, (And, Or)):
+            program.append(AND if isinstance(node, And) else OR)
+            write_varint(program, len(subsentences))
+        elif isinstance(node, Implication):
+            program.append(IMPLICATION)
+        else:
+            program.append(BICONDITIONAL)
+        numbers[id(node)] = len(numbers)
+        count += 1
+
+    data = bytearray(MAGIC)
+    write_varint(data, len(names))
+    for name in names:
+        encoded = name.encode("utf-8")
+        write_varint(data, len(encoded))
+        data += encoded
+    write_varint(data, count)
+    return bytes(data + program)
+
+
+def loads(data):
+    """Deserializes a sentence from bytes written by `dumps`."""
+    if data[:len(MAGIC)] != MAGIC:
+        raise ValueError("not a serialized knowledge base")
+    try:
+        position = len(MAGIC)
+        symbol_count, position = read_varint(data, position)
+        symbols = []
+        for _ in range(symbol_count):
+            length, position = read_varint(data, position)
+            name = bytes(data[position:position + length]).decode("utf-8")
+            if len(name.encode("utf-8")) != length:
+                raise IndexError
+            symbols.append(Symbol(name))
+            position += length
+
+        count, position = read_varint(data, position)
+        nodes = []
+        stack = []
+        for _ in range(count):
+            opcode = data[position]
+            position += 1
+            if opcode == REF:
+                number, position = read_varint(data, position)
+                stack.append(nodes[number])
+                continue
+            if opcode == SYMBOL:
+                index, position = read_varint(data, position)
+                node = symbols[index]
+            elif opcode == NOT:
+                node = Not(stack.pop())
+            elif opcode == AND or opcode == OR:
+                arity, position = read_varint(data, position)
+                operands = stack[len(stack) - arity:]
+                del stack[len(stack) - arity:]
+                node = And(*operands) if opcode == AND else Or(*operands)
+            elif opcode == IMPLICATION or opcode == BICONDITIONAL:
+                right = stack.pop()
+                left = stack.pop()
+                kind = Implication if opcode == IMPLICATION else Biconditional
+                node = kind(left, right)
+            else:
+                raise ValueError(f"unknown opcode {opcode}")
+            nodes.append(node)
+            stack.append(node)
+    except IndexError:
+        raise ValueError("truncated or corrupt knowledge base")
+
+    if len(stack) != 1:
+        raise ValueError("corrupt knowledge base")
+    return stack[0]
+
+
+def dump(sentence, f):
+    """Writes a serialized sentence to a binary file."""
+    f.write(dumps(sentence))
+
+
+def load(f):
+    """Reads a serialized sentence from a binary file."""
+    return loads(f.read())
@@ -0,0 +1,77 @@
+import argparse
+import resource
+import time
+
+from minesweeper import Minesweeper, MinesweeperAI
+
+SIZES = [16, 32, 64, 128, 256, 512, 1000]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure MinesweeperAI's per-move cost by board size."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES,
+                        help="side lengths of the square boards")
+    parser.add_argument("--density", type=float, default=0.15,
+                        help="fraction of cells that are mines")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print("  size      cells   moves  guesses  mean(us)  "
+          "p99(us)  guess(ms)  seconds  peak(MB)")
+    for size in args.sizes:
+        result = play_through(size, size, int(size * size * args.density),
+                              args.seed)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"{size:6} {size * size:10} {result['moves']:7} "
+              f"{result['guesses']:8} {result['mean'] * 1e6:9.1f} "
+              f"{result['p99'] * 1e6:8.1f} "
+              f"{result['guess_mean'] * 1e3:10.2f} "
+              f"{result['seconds']:8.2f} "
+              f"{peak:9.1f}")
+
+
+def play_through(height, width, mines, seed):
+    """
+    Plays a whole board, marking any mine the AI steps on instead of
+    ending the game, so that every size is measured to completion.
+    Returns move counts and timings.
+    """
+    game = Minesweeper(height=height, width=width, mines=mines, seed=seed)
+    ai = MinesweeperAI(height=height, width=width, mines=mines)
+    latencies = []
+    guess_times = []
+
+    start = time.perf_counter()
+    while True:
+        move_start = time.perf_counter()
+        move = ai.make_safe_move()
+        if move is None:
+            move = ai.make_random_move()
+            guess_times.append(time.perf_counter() - move_start)
+        if move is None:
+            break
+        if game.is_mine(move):
+            ai.mark_mine(move)
+            ai.update_cell_knowledge()
+        else:
+            for cell in game.reveal(move):
+                if cell not in ai.moves_made:
+                    ai.add_knowledge(cell, game.nearby_mines(cell))
+        latencies.append(time.perf_counter() - move_start)
+    seconds = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "moves": len(latencies),
+        "guesses": len(guess_times),
+        "mean": sum(latencies) / len(latencies),
+        "p99": latencies[int(0.99 * (len(latencies) - 1))],
+        "guess_mean": sum(guess_times) / max(len(guess_times), 1),
+        "seconds": seconds,
+    }
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+import math
+from collections import deque
+
+# Most partial assignments tried for one frontier component before
+# falling back to an estimate from its sentences alone
+NODE_LIMIT = 20000
+
+# Largest component enumerated, which also bounds the recursion depth
+CELL_LIMIT = 400
+
+
+def mine_probabilities(constraints, others, mines_left,
+                       node_limit=NODE_LIMIT):
+    """
+    Computes the probability that each frontier cell is a mine.
+
+    `constraints` is a list of `(cells, count)` pairs, each saying that
+    exactly `count` of `cells` are mines. `others` is the number of
+    unknown cells outside every constraint, and `mines_left` the number
+    of mines not yet found.
+
+    The frontier is split into independent components, the consistent
+    mine configurations of each are enumerated by backtracking, and the
+    components are combined with the number of ways to place the
+    remaining mines among the other cells.
+
+    Returns a dictionary from frontier cell to probability, and the
+    probability for any one of the other cells.
+    """
+    solved = [
+        solve_component(component, node_limit)
+        for component in components(constraints)
+    ]
+    return combine(solved, others, mines_left)
+
+
+def solve_component(constraints, node_limit=NODE_LIMIT):
+    """
+    Solves one component's constraints, returning its enumeration (see
+    enumerate_component), or a dictionary of estimated probabilities
+    from its sentences alone if it has too many configurations.
+    """
+    solutions = enumerate_component(constraints, node_limit)
+    if solutions is None:
+        return local_estimate(constraints)
+    return solutions
+
+
+def combine(solved, others, mines_left):
+    """
+    Combines the solutions of independent components, as returned by
+    solve_component, into probabilities like mine_probabilities.
+    Callers that keep components between calls only need to solve the
+    ones that changed.
+    """
+    exact = []
+    probabilities = dict()
+    for solution in solved:
+        if isinstance(solution, dict):
+            # Too many configurations, so estimate from each sentence
+            probabilities.update(solution)
+            mines_left -= round(sum(solution.values()))
+        else:
+            exact.append(solution)
+
+    # Relative number of ways to place the mines not on the frontier
+    # among the other cells, for each number of frontier mines
+    most = sum(max(counts) for counts, _, _ in exact)
+    weights = placements(others, mines_left, most)
+    if not any(weights):
+        # The estimates made the mine count inconsistent, so ignore it
+        weights = [1.0] * (most + 1)
+
+    # Distribution of the number of mines in the exact components
+    # before each one
+    prefix = [[1.0]]
+    for counts, _, _ in exact:
+        prefix.append(convolve(prefix[-1], counts))
+
+    # Weight of filling the components after each one and the other
+    # cells, given the number of mines on the components up to it.
+    # Folding the placements in as we go keeps each step linear in the
+    # number of mines, where convolving the distributions before and
+    # after every component was quadratic.
+    later = [weights]
+    for counts, _, _ in reversed(exact):
+        later.append(correlate(later[-1], counts))
+    later.reverse()
+
+    for i, (counts, cell_counts, cells) in enumerate(exact):
+        after = later[i + 1]
+        total = 0.0
+        mines = dict()
+        for k in counts:
+            # Weight of every configuration of this component with k mines
+            weight = sum(
+                ways * after[k + m] for m, ways in enumerate(prefix[i])
+            )
+            total += counts[k] * weight
+            for cell, count in cell_counts[k].items():
+                mines[cell] = mines.get(cell, 0.0) + count * weight
+        for cell in cells:
+            probabilities[cell] = mines.get(cell, 0.0) / total if total else 0
+
+    # Expected number of mines among the other cells
+    other = 0.0
+    if others:
+        frontier = prefix[-1]
+        total = sum(
+            ways * weights[m] for m, ways in enumerate(frontier)
+        )
+        expected = sum(
+            ways * weights[m] * (mines_left - m)
+            for m, ways in enumerate(frontier)
+        )
+        other = expected / total / others if total else 0.0
+    return probabilities, min(max(other, 0.0), 1.0)
+
+
+def components(constraints):
+    """
+    Splits constraints into groups that share no cells with each other,
+    using union-find over cells.
+    """
+    parent = dict()
+
+    def find(cell):
+        while parent[cell] != cell:
+            parent[cell] = parent[parent[cell]]
+            cell = parent[cell]
+        return cell
+
+    for cells, _ in constraints:
+        cells = list(cells)
+        for cell in cells:
+            parent.setdefault(cell, cell)
+        root = find(cells[0])
+        for cell in cells[1:]:
+            parent[find(cell)] = root
+
+    groups = dict()
+    for cells, count in constraints:
+        groups.setdefault(find(next(iter(cells))), []).append((cells, count))
+    return list(groups.values())
+
+
+def enumerate_component(constraints, node_limit):
+    """
+    Enumerates every mine configuration consistent with a component's
+    constraints by backtracking.
+
+    Returns two dictionaries keyed by number of mines `k`, the number of
+    configurations with `k` mines and for each cell how many of those
+    configurations make it a mine, along with the component's cells.
+    Returns None if more than `node_limit` partial assignments are
+    needed.
+    """
+    # Sort the constraints so the result does not depend on the order
+    # they were listed in, then visit cells breadth-first through shared
+    # constraints so that each constraint is completed as early as possible
+    constraints = sorted(constraints, key=lambda c: (sorted(c[0]), c[1]))
+    containing = dict()
+    for index, (cells, _) in enumerate(constraints):
+        for cell in cells:
+            containing.setdefault(cell, []).append(index)
+    order = []
+    seen = set()
+    for start in sorted(containing):
+        if start in seen:
+            continue
+        seen.add(start)
+        queue = deque([start])
+        while queue:
+            cell = queue.popleft()
+            order.append(cell)
+            for index in containing[cell]:
+                for other in sorted(constraints[index][0]):
+                    if other not in seen:
+                        seen.add(other)
+                        queue.append(other)
+
+    # Mines still needed and cells still unassigned per constraint
+    needed = [count for _, count in constraints]
+    unassigned = [len(cells) for cells, _ in constraints]
+    mines = []
+    counts = dict()
+    cell_counts = dict()
+    nodes = 0
+
+    def assign(position):
+        nonlocal nodes
+        nodes += 1
+        if nodes > node_limit:
+            return False
+        if position == len(order):
+            k = len(mines)
+            counts[k] = counts.get(k, 0) + 1
+            tally = cell_counts.setdefault(k, dict())
+            for cell in mines:
+                tally[cell] = tally.get(cell, 0) + 1
+            return True
+
+        cell = order[position]
+        for mine in (False, True):
+            consistent = True
+            for index in containing[cell]:
+                unassigned[index] -= 1
+                needed[index] -= mine
+                if needed[index] < 0 or needed[index] > unassigned[index]:
+                    consistent = False
+            if consistent:
+                if mine:
+                    mines.append(cell)
+                finished = assign(position + 1)
+                if mine:
+                    mines.pop()
+            else:
+                finished = True
+            for index in containing[cell]:
+                unassigned[index] += 1
+                needed[index] += mine
+            if not finished:
+                return False
+        return True
+
+    if len(order) > CELL_LIMIT or not assign(0):
+        return None
+    return counts, cell_counts, order
+
+
+def local_estimate(constraints):
+    """
+    Estimates each cell's mine probability as the highest mine density
+    among the constraints containing it.
+    """
+    estimate = dict()
+    for cells, count in constraints:
+        density = count / len(cells)
+        for cell in cells:
+            estimate[cell] = max(estimate.get(cell, 0.0), density)
+    return estimate
+
+
+def convolve(a, b):
+    """
+    Multiplies two distributions over numbers of mines, given as lists
+    or as dictionaries from number of mines to weight.
+    """
+    a = a.items() if isinstance(a, dict) else enumerate(a)
+    b = list(b.items() if isinstance(b, dict) else enumerate(b))
+    result = []
+    for i, x in a:
+        for j, y in b:
+            while len(result) <= i + j:
+                result.append(0.0)
+            result[i + j] += x * y
+
+    # Rescale so products of many components cannot overflow; only
+    # ratios between the weights are ever used
+    scale = max(result, default=0.0)
+    return [x / scale for x in result] if scale else result
+
+
+def correlate(weights, counts):
+    """
+    Returns weights given the mines before a component, from `weights`
+    given the mines up to and including it and the component's number
+    of configurations with each number of mines, `counts`.
+    """
+    result = [0.0] * len(weights)
+    for k, ways in counts.items():
+        for j in range(len(weights) - k):
+            result[j] += ways * weights[j + k]
+
+    # Only ratios between the weights are used, as in convolve
+    scale = max(result, default=0.0)
+    return [x / scale for x in result] if scale else result
+
+
+def placements(others, mines_left, most):
+    """
+    Returns, for 0 to `most` mines on the frontier, the relative number
+    of ways to place the remaining mines among the other cells.
+    """
+    logs = []
+    for m in range(most + 1):
+        rest = mines_left - m
+        if 0 <= rest <= others:
+            logs.append(
+                math.lgamma(others + 1) - math.lgamma(rest + 1)
+                - math.lgamma(others - rest + 1)
+            )
+        else:
+            logs.append(None)
+    top = max((x for x in logs if x is not None), default=None)
+    return [0.0 if x is None else math.exp(x - top) for x in logs]
@@ -1,5 +1,16 @@
+import contextlib
 import itertools
-import random
+import time
+from collections import deque
+
+import numpy as np
+from scipy import ndimage
+
+from guess import combine, solve_component
+
+
+# Context used in place of a profiler phase when profiling is off
+NOT_PROFILING = contextlib.nullcontext()
 
 
 class Minesweeper():
@@ -7,28 +18,37 @@ class Minesweeper():
     Minesweeper game representation
     """
 
-    def __init__(self, height=8, width=8, mines=8):
+    def __init__(self, height=8, width=8, mines=8, seed=None):
 
         # Set initial width, height, and number of mines
         self.height = height
         self.width = width
-        self.mines = set()
 
-        # Initialize an empty field with no mines
-        self.board = []
-        for i in range(self.height):
-            row = []
-            for j in range(self.width):
-                row.append(False)
-            self.board.append(row)
-
-        # Add mines randomly
-        while len(self.mines) != mines:
-            i = random.randrange(height)
-            j = random.randrange(width)
-            if not self.board[i][j]:
-                self.mines.add((i, j))
-                self.board[i][j] = True
+        # Place mines by sampling distinct cells. A seed is always
+        # chosen and kept, so that the same board can be played again
+        if seed is None:
+            seed = np.random.SeedSequence().entropy
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        positions = rng.choice(height * width, size=mines, replace=False)
+        self.board = np.zeros((height, width), dtype=bool)
+        self.board.flat[positions] = True
+        self.mines = {divmod(p, width) for p in positions.tolist()}
+
+        # Count every cell's neighboring mines once, by convolution
+        # with a 3x3 window that leaves out the cell itself
+        window = np.ones((3, 3), dtype=np.int8)
+        window[1, 1] = 0
+        self.counts = ndimage.convolve(
+            self.board.astype(np.int8), window, mode="constant"
+        )
+
+        # Label connected regions of safe cells with no neighboring
+        # mines, which are revealed all at once
+        self.zero_regions, _ = ndimage.label(
+            (self.counts == 0) & ~self.board, structure=np.ones((3, 3))
+        )
+        self.region_slices = ndimage.find_objects(self.zero_regions)
 
         # At first, player has found no mines
         self.mines_found = set()
@@ -50,7 +70,7 @@ class Minesweeper():
 
     def is_mine(self, cell):
         i, j = cell
-        return self.board[i][j]
+        return bool(self.board[i, j])
 
     def nearby_mines(self, cell):
         """
@@ -58,24 +78,33 @@ class Minesweeper():
         within one row and column of a given cell,
         not including the cell itself.
         """
+        i, j = cell
+        return int(self.counts[i, j])
 
-        # Keep count of nearby mines
-        count = 0
-
-        # Loop over all cells within one row and column
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
-
-                # Ignore the cell itself
-                if (i, j) == cell:
-                    continue
-
-                # Update count if cell in bounds and is mine
-                if 0 <= i < self.height and 0 <= j < self.width:
-                    if self.board[i][j]:
-                        count += 1
-
-        return count
+    def reveal(self, cell):
+        """
+        Returns the set of cells revealed by clicking a safe cell.
+        A cell with no neighboring mines reveals its whole region of
+        such cells, along with every cell bordering that region.
+        """
+        i, j = cell
+        label = self.zero_regions[i, j]
+        if not label:
+            return {cell}
+
+        # Work inside the region's bounding box, grown by one cell
+        # on each side to take in the border
+        rows, cols = self.region_slices[label - 1]
+        top = max(rows.start - 1, 0)
+        left = max(cols.start - 1, 0)
+        bottom = min(rows.stop + 1, self.height)
+        right = min(cols.stop + 1, self.width)
+        region = self.zero_regions[top:bottom, left:right] == label
+        revealed = ndimage.binary_dilation(
+            region, structure=np.ones((3, 3), dtype=bool)
+        )
+        rs, cs = np.nonzero(revealed)
+        return set(zip((rs + top).tolist(), (cs + left).tolist()))
 
     def won(self):
         """
@@ -89,18 +118,99 @@ class Sentence():
     Logical statement about a Minesweeper game
     A sentence consists of a set of board cells,
     and a count of the number of those cells which are mines.
+
+    Cells are stored as an integer bitmask over the board's cells in
+    row-major order, so subset tests, differences and marking are
+    single integer operations. Bit `k` of `mask` stands for the cell
+    with linear index `offset + k`; the mask is kept shifted so its
+    lowest bit is set, which keeps masks small on large boards.
+    Sentences compared with each other must share the same `width`,
+    and a cell whose column is outside the width raises ValueError
+    rather than standing for a cell on another row.
     """
 
-    def __init__(self, cells, count):
-        self.cells = set(cells)
+    def __init__(self, cells, count, width=8):
+        self.width = width
         self.count = count
+        indexes = []
+        for i, j in cells:
+            if not 0 <= j < width:
+                raise ValueError(
+                    f"cell {(i, j)} is outside a board {width} wide"
+                )
+            indexes.append(i * width + j)
+        self.offset = min(indexes, default=0)
+        self.mask = 0
+        for index in indexes:
+            self.mask |= 1 << (index - self.offset)
+
+    @classmethod
+    def from_mask(cls, offset, mask, count, width):
+        """Creates a sentence directly from a bitmask of cells."""
+        sentence = cls((), count, width)
+        sentence.offset = offset
+        sentence.mask = mask
+        sentence.normalize()
+        return sentence
+
+    def normalize(self):
+        """Shifts the mask so that its lowest bit is set."""
+        if not self.mask:
+            self.offset = 0
+            return
+        shift = (self.mask & -self.mask).bit_length() - 1
+        self.mask >>= shift
+        self.offset += shift
+
+    @property
+    def cells(self):
+        """The set of `(i, j)` cells in the sentence."""
+        cells = set()
+        mask = self.mask
+        while mask:
+            lowest = mask & -mask
+            index = self.offset + lowest.bit_length() - 1
+            cells.add(divmod(index, self.width))
+            mask ^= lowest
+        return cells
+
+    def __len__(self):
+        return self.mask.bit_count()
 
     def __eq__(self, other):
-        return self.cells == other.cells and self.count == other.count
+        return (self.mask == other.mask and self.offset == other.offset
+                and self.count == other.count)
+
+    def __hash__(self):
+        return hash((self.offset, self.mask, self.count))
 
     def __str__(self):
         return f"{self.cells} = {self.count}"
 
+    def aligned(self, other):
+        """
+        Returns both sentences' masks shifted to a common offset,
+        along with that offset.
+        """
+        offset = min(self.offset, other.offset)
+        return (self.mask << (self.offset - offset),
+                other.mask << (other.offset - offset), offset)
+
+    def is_proper_subset(self, other):
+        """Checks if this sentence's cells are a proper subset of other's."""
+        mine, theirs, _ = self.aligned(other)
+        return mine != theirs and mine & ~theirs == 0
+
+    def difference(self, other):
+        """
+        Returns the sentence about the cells in this sentence but not in
+        `other`, assuming `other` is a subset of it.
+        """
+        mine, theirs, offset = self.aligned(other)
+        return Sentence.from_mask(
+            offset, mine & ~theirs, self.count - other.count, self.width
+        )
+
     def known_mines(self):
         """
         Returns the set of all cells in self.cells known to be mines.
@@ -108,7 +218,7 @@ class Sentence():
         We can only tell which ones are mines when every cell is a
         mine otherwise we don't have enough information to choose any
         """
-        return self.cells if len(self.cells) == self.count else set()
+        return self.cells if len(self) == self.count else set()
 
     def known_safes(self):
         """
@@ -124,8 +234,7 @@ class Sentence():
         Updates internal knowledge representation given the fact that
         a cell is known to be a mine.
         """
-        if cell in self.cells:
-            self.cells.remove(cell)
+        if self.remove(cell):
             self.count = self.count - 1
 
     def mark_safe(self, cell):
@@ -133,8 +242,210 @@ class Sentence():
         Updates internal knowledge representation given the fact that
         a cell is known to be safe.
         """
-        if cell in self.cells:
-            self.cells.remove(cell)
+        self.remove(cell)
+
+    def remove(self, cell):
+        """Removes a cell if present. Returns True if it was present."""
+        bit = cell[0] * self.width + cell[1] - self.offset
+        if bit < 0 or not (self.mask >> bit) & 1:
+            return False
+        self.mask ^= 1 << bit
+        self.normalize()
+        return True
+
+
+class Region():
+    """
+    Group of sentences connected through shared cells, directly or
+    through other sentences. Sentences in different regions constrain
+    disjoint cells, so the guess engine can solve each region alone.
+    """
+
+    def __init__(self):
+        # Sentences keyed by id, which unlike their hash does not
+        # change as they are marked
+        self.sentences = dict()
+
+        # Mine configurations found by the guess engine, kept until a
+        # sentence of the region is added or removed
+        self.solution = None
+
+
+class KnowledgeBase():
+    """
+    Set of sentences about a Minesweeper game, indexed by cell.
+
+    Sentences are hashed by their contents, so duplicates are found
+    with a single lookup, and every cell maps to the sentences that
+    contain it, so marking a cell only touches those sentences.
+    Sentences must not be changed directly while they are stored,
+    only through `mark_mine` and `mark_safe`.
+
+    Sentences are also grouped into regions as they are added, merging
+    the regions a new sentence connects. Removing a sentence may split
+    its region, so the region is only marked dirty and split the next
+    time `components` is called.
+    """
+
+    def __init__(self):
+        self.sentences = set()
+        self.cells = dict()
+
+        # Region of each sentence by id, every region, and the regions
+        # that may have split, kept as dictionaries so they iterate in
+        # the same order in every game played the same way
+        self.region = dict()
+        self.regions = dict()
+        self.dirty = dict()
+
+        # Optional profiler.Profiler, shared with the AI using this
+        # knowledge base
+        self.profiler = None
+
+    def phase(self, name):
+        """
+        Returns a context that times a phase of work when a profiler
+        is attached, and does nothing otherwise.
+        """
+        if self.profiler is None:
+            return NOT_PROFILING
+        return self.profiler.phase(name)
+
+    def __contains__(self, sentence):
+        return sentence in self.sentences
+
+    def __iter__(self):
+        return iter(self.sentences)
+
+    def __len__(self):
+        return len(self.sentences)
+
+    def add(self, sentence):
+        """
+        Adds a sentence unless it is empty or an equal one is already
+        known. Returns True if the sentence was added.
+        """
+        if not len(sentence) or sentence in self.sentences:
+            return False
+        self.sentences.add(sentence)
+        # Sentences sharing a cell share a region, so one sentence per
+        # cell is enough to find the regions this sentence connects
+        joined = dict()
+        for cell in sentence.cells:
+            containing = self.cells.setdefault(cell, set())
+            if containing:
+                other = next(iter(containing))
+                joined[self.region[id(other)]] = None
+            containing.add(sentence)
+
+        if not joined:
+            region = Region()
+            self.regions[region] = None
+        elif len(joined) == 1:
+            region, = joined
+        else:
+            region = self.merge(joined)
+        region.sentences[id(sentence)] = sentence
+        region.solution = None
+        self.region[id(sentence)] = region
+        return True
+
+    def merge(self, regions):
+        """
+        Merges regions into the largest of them, so that each sentence
+        changes region a logarithmic number of times at most, and
+        returns it.
+        """
+        region = max(regions, key=lambda r: len(r.sentences))
+        for other in regions:
+            if other is region:
+                continue
+            for key in other.sentences:
+                self.region[key] = region
+            region.sentences.update(other.sentences)
+            del self.regions[other]
+            if other in self.dirty:
+                del self.dirty[other]
+                self.dirty[region] = None
+        return region
+
+    def remove(self, sentence):
+        """Removes a sentence and its cell index entries."""
+        self.sentences.remove(sentence)
+        for cell in sentence.cells:
+            containing = self.cells[cell]
+            containing.discard(sentence)
+            if not containing:
+                del self.cells[cell]
+
+        region = self.region.pop(id(sentence))
+        del region.sentences[id(sentence)]
+        region.solution = None
+        if region.sentences:
+            self.dirty[region] = None
+        else:
+            del self.regions[region]
+            self.dirty.pop(region, None)
+
+    def components(self):
+        """
+        Returns every region, after splitting the regions that changed
+        since the last call into groups of sentences sharing cells.
+        Only the sentences of those regions are visited.
+        """
+        for region in self.dirty:
+            del self.regions[region]
+            unvisited = dict(region.sentences)
+            while unvisited:
+                part = Region()
+                self.regions[part] = None
+                stack = [unvisited.popitem()[1]]
+                while stack:
+                    sentence = stack.pop()
+                    part.sentences[id(sentence)] = sentence
+                    self.region[id(sentence)] = part
+                    for cell in sentence.cells:
+                        for other in self.cells[cell]:
+                            if id(other) in unvisited:
+                                del unvisited[id(other)]
+                                stack.append(other)
+        self.dirty.clear()
+        return list(self.regions)
+
+    def overlapping(self, sentence):
+        """Returns the other sentences sharing a cell with `sentence`."""
+        result = set()
+        for cell in sentence.cells:
+            result.update(self.cells.get(cell, ()))
+        result.discard(sentence)
+        return result
+
+    def mark_mine(self, cell):
+        """
+        Marks a cell as a mine in every sentence containing it.
+        Returns the list of sentences that changed.
+        """
+        return self.mark(cell, Sentence.mark_mine)
+
+    def mark_safe(self, cell):
+        """
+        Marks a cell as safe in every sentence containing it.
+        Returns the list of sentences that changed.
+        """
+        return self.mark(cell, Sentence.mark_safe)
+
+    def mark(self, cell, update):
+        changed = []
+        with self.phase("pruning"):
+            for sentence in list(self.cells.get(cell, ())):
+                # A sentence's hash depends on its cells, so it has to
+                # leave the index before it changes. If it is now empty
+                # or equals another sentence, it stays out.
+                self.remove(sentence)
+                update(sentence, cell)
+                if self.add(sentence):
+                    changed.append(sentence)
+        return changed
 
 
 class MinesweeperAI():
@@ -142,11 +453,12 @@ class MinesweeperAI():
     Minesweeper game player
     """
 
-    def __init__(self, height=8, width=8):
+    def __init__(self, height=8, width=8, mines=8):
 
-        # Set initial height and width
+        # Set initial height, width, and number of mines on the board
         self.height = height
         self.width = width
+        self.mine_count = mines
 
         # Keep track of which cells have been clicked on
         self.moves_made = set()
@@ -155,26 +467,78 @@ class MinesweeperAI():
         self.mines = set()
         self.safes = set()
 
-        # List of sentences about the game known to be true
-        self.knowledge = []
+        # Safe cells in the order they were found, so a safe move
+        # never has to search every known safe cell
+        self.safe_moves = deque()
+
+        # Linear index of the first cell that may still be guessed away
+        # from the frontier. Cells before it have been played, are mines
+        # or are on the frontier, and none of those can become a fresh
+        # unexplored cell again, so each cell is passed over once a game
+        self.unexplored = 0
+
+        # Nonzero for each cell played or known to be a mine, by linear
+        # index, so the pointer skips runs of them with bytearray.find
+        self.blocked = bytearray(height * width)
+
+        # Sentences about the game known to be true
+        self.knowledge = KnowledgeBase()
+
+        # Sentences added or changed since inference last ran, keyed
+        # by id because a sentence's hash changes when it is marked
+        self.pending = dict()
+
+        # Number of sentences inferred, and seconds spent on
+        # inference for each move
+        self.inferences = 0
+        self.inference_times = []
+
+    @property
+    def profiler(self):
+        """
+        Optional profiler.Profiler timing each phase of work, shared
+        with the knowledge base so that pruning it is timed too.
+        """
+        return self.knowledge.profiler
+
+    @profiler.setter
+    def profiler(self, profiler):
+        self.knowledge.profiler = profiler
+
+    def phase(self, name):
+        """
+        Returns a context that times a phase of work when a profiler
+        is attached, and does nothing otherwise.
+        """
+        return self.knowledge.phase(name)
 
     def mark_mine(self, cell):
         """
         Marks a cell as a mine, and updates all knowledge
         to mark that cell as a mine as well.
         """
+        if cell in self.mines:
+            return
         self.mines.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_mine(cell)
+        self.blocked[cell[0] * self.width + cell[1]] = 1
+        self.queue(self.knowledge.mark_mine(cell))
 
     def mark_safe(self, cell):
         """
         Marks a cell as safe, and updates all knowledge
         to mark that cell as safe as well.
         """
+        if cell in self.safes:
+            return
         self.safes.add(cell)
-        for sentence in self.knowledge:
-            sentence.mark_safe(cell)
+        if cell not in self.moves_made:
+            self.safe_moves.append(cell)
+        self.queue(self.knowledge.mark_safe(cell))
+
+    def queue(self, sentences):
+        """Queues sentences to be checked for new inferences."""
+        for sentence in sentences:
+            self.pending[id(sentence)] = sentence
 
     def search_cells(self, logic):
         """
@@ -189,49 +553,53 @@ class MinesweeperAI():
 
     def add_inference(self, inference):
         """
-        Adds inference to knowledge and then calls
-        update_cell_knowledge to make more inferences
-        """
-        if inference not in self.knowledge:
-            self.knowledge.append(inference)
-            # We can try making new inferences now
-            self.update_cell_knowledge(inference)
-
-    def update_cell_knowledge(self, logic):
-        """
-        Makes inferences from knowledge by checking
-        sentances for new safe and mines locations
-        and checking if one sentence is a subset of
-        another to whittle down the potential locations
-        of mines.
-        """
-        for statement in self.knowledge:
-            # First, check if sentence has new information
-            self.search_cells(statement)
-            count_diff = abs(statement.count - logic.count)
-
-            # Statement is a proper subset of logic
-            if statement.cells < logic.cells:
-                # Get the cells that aren't in the subset and make
-                # a new sentence with the the number of mines not
-                # in the subset ("the subset method")
-                difference = logic.cells - statement.cells
-                inference = Sentence(difference, count_diff)
-                self.add_inference(inference)
-
-            # Logic is a proper subset of statement
-            if logic.cells < statement.cells:
-                # Uses the subset method but with the subset 
-                # and superset flipped
-                difference = statement.cells - logic.cells
-                inference = Sentence(difference, count_diff)
-                self.add_inference(inference)
-    
-    def prune_knowledge(self):
-        for statement in self.knowledge.copy():
-            # Removes empty sentances since they clutter set
-            if len(statement.cells) == 0:
-                self.knowledge.remove(statement)
+        Adds inference to knowledge and queues it
+        to make more inferences
+        """
+        if self.knowledge.add(inference):
+            self.inferences += 1
+            self.queue([inference])
+
+    def update_cell_knowledge(self):
+        """
+        Makes inferences from knowledge until no more can be made.
+
+        Each pending sentence is checked for new safe and mine
+        locations, and compared with the sentences it shares cells
+        with, checking if one is a subset of the other to whittle
+        down the potential locations of mines. Anything that changes
+        is queued again, so a loop replaces recursion.
+        """
+        while self.pending:
+            _, logic = self.pending.popitem()
+
+            # The sentence may have been emptied or merged into an
+            # equal one since it was queued
+            if logic not in self.knowledge:
+                continue
+
+            # First, check if sentence has new information. Marking
+            # its cells empties it, so there is nothing left to compare
+            if logic.count == 0 or len(logic) == logic.count:
+                with self.phase("marking"):
+                    self.search_cells(logic)
+                continue
+
+            # Only sentences sharing a cell can be subsets of each other
+            for statement in self.knowledge.overlapping(logic):
+
+                # Statement is a proper subset of logic
+                if statement.is_proper_subset(logic):
+                    # Get the cells that aren't in the subset and make
+                    # a new sentence with the the number of mines not
+                    # in the subset ("the subset method")
+                    self.add_inference(logic.difference(statement))
+
+                # Logic is a proper subset of statement
+                elif logic.is_proper_subset(statement):
+                    # Uses the subset method but with the subset
+                    # and superset flipped
+                    self.add_inference(statement.difference(logic))
 
     def add_knowledge(self, cell, count):
         """
@@ -248,39 +616,42 @@ class MinesweeperAI():
             5) add any new sentences to the AI's knowledge base
                if they can be inferred from existing knowledge
         """
-        self.moves_made.add(cell)
-        self.mark_safe(cell)
-
-        # Get neighbors that we know aren't already mines
-        # or safe spaces to gain more knowledge
-        neighbors = set()
-        # Partially taken from Minesweeper class
-        for i in range(cell[0] - 1, cell[0] + 2):
-            for j in range(cell[1] - 1, cell[1] + 2):
-                # Must ensure we avoid coords like (0,-1)
-                i_bounds = i >= 0 and i < self.height
-                j_bounds = j >= 0 and j < self.width
-                not_in_bounds = not(i_bounds and j_bounds)
-                # A cell is not its own neighbor
-                is_cell = (i, j) == cell
-
-                # Update the sentence with previous knowledge to
-                # eliminate conflicting or misleading knowledge.
-                discovered = (i, j) in self.safes
-                if is_cell or not_in_bounds or discovered:
-                    continue
-                is_mine = (i, j) in self.mines
-                if is_mine:
-                    count = count - 1
-                    continue
-
-                neighbors.add((i, j))
-        logic = Sentence(neighbors, count)
-
-        self.knowledge.append(logic)
-        self.update_cell_knowledge(logic)
-        # Reduce clutter for simplicity and debugging
-        self.prune_knowledge()
+        start = time.perf_counter()
+        with self.phase("marking"):
+            self.moves_made.add(cell)
+            self.blocked[cell[0] * self.width + cell[1]] = 1
+            self.mark_safe(cell)
+
+            # Get neighbors that we know aren't already mines
+            # or safe spaces to gain more knowledge
+            neighbors = set()
+            # Partially taken from Minesweeper class
+            for i in range(cell[0] - 1, cell[0] + 2):
+                for j in range(cell[1] - 1, cell[1] + 2):
+                    # Must ensure we avoid coords like (0,-1)
+                    i_bounds = i >= 0 and i < self.height
+                    j_bounds = j >= 0 and j < self.width
+                    not_in_bounds = not(i_bounds and j_bounds)
+                    # A cell is not its own neighbor
+                    is_cell = (i, j) == cell
+
+                    # Update the sentence with previous knowledge to
+                    # eliminate conflicting or misleading knowledge.
+                    discovered = (i, j) in self.safes
+                    if is_cell or not_in_bounds or discovered:
+                        continue
+                    is_mine = (i, j) in self.mines
+                    if is_mine:
+                        count = count - 1
+                        continue
+
+                    neighbors.add((i, j))
+            logic = Sentence(neighbors, count, self.width)
+            if self.knowledge.add(logic):
+                self.queue([logic])
+        with self.phase("inference"):
+            self.update_cell_knowledge()
+        self.inference_times.append(time.perf_counter() - start)
 
     def make_safe_move(self):
         """
@@ -291,22 +662,73 @@ class MinesweeperAI():
         This function may use the knowledge in self.mines, self.safes
         and self.moves_made, but should not modify any of those values.
         """
-        for safe_cell in self.safes:
-            if safe_cell not in self.moves_made:
-                return safe_cell
-        return None
+        with self.phase("move selection"):
+            # Drop safe cells that have been played since they were found
+            with self.phase("skipping played cells"):
+                while (self.safe_moves
+                       and self.safe_moves[0] in self.moves_made):
+                    self.safe_moves.popleft()
+            return self.safe_moves[0] if self.safe_moves else None
 
     def make_random_move(self):
         """
         Returns a move to make on the Minesweeper board.
-        Should choose randomly among cells that:
+        Should choose among cells that:
             1) have not already been chosen, and
             2) are not known to be mines
+        Picks the cell least likely to be a mine, given the
+        knowledge base and the number of mines left.
+        """
+        with self.phase("move selection"):
+            return self.choose_guess()
+
+    def choose_guess(self):
+        """
+        Returns the unknown cell least likely to be a mine,
+        or None if no unknown cells are left.
         """
-        for row in range(self.height):
-            for col in range(self.width):
-                new_move = (row, col) not in self.moves_made
-                not_mine = (row, col) not in self.mines
-                if new_move and not_mine:
-                    return (row, col)
-        return None
+        # Cells next to revealed cells are constrained by the
+        # knowledge base, every other unknown cell is alike. Every
+        # move is marked safe, so played cells are among the safes.
+        frontier = self.knowledge.cells
+        cells = self.height * self.width
+        others = cells - len(self.safes) - len(self.mines) - len(frontier)
+        with self.phase("skipping played cells"):
+            while True:
+                self.unexplored = self.blocked.find(0, self.unexplored)
+                if self.unexplored < 0:
+                    self.unexplored = cells
+                    break
+                if divmod(self.unexplored, self.width) not in frontier:
+                    break
+                self.unexplored += 1
+        if self.unexplored == cells:
+            others = 0
+        if not frontier and not others:
+            return None
+
+        # Only regions changed since the last guess are solved again
+        solved = []
+        for region in self.knowledge.components():
+            if region.solution is None:
+                region.solution = solve_component([
+                    (sentence.cells, sentence.count)
+                    for sentence in region.sentences.values()
+                ])
+            solved.append(region.solution)
+        mines_left = self.mine_count - len(self.mines)
+        probabilities, other = combine(solved, others, mines_left)
+
+        # Ties go to the first cell in row-major order. Probabilities
+        # are rounded so that the order the knowledge base happens to
+        # list sentences in cannot break ties through float error.
+        best = min(
+            probabilities,
+            key=lambda cell: (round(probabilities[cell], 9), cell),
+            default=None
+        )
+        if others and (
+            best is None or round(other, 9) < round(probabilities[best], 9)
+        ):
+            return divmod(self.unexplored, self.width)
+        return best
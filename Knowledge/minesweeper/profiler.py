@@ -0,0 +1,58 @@
+import time
+from contextlib import contextmanager
+
+
+class Profiler():
+    """
+    Times nested phases of work, such as the marking, inference,
+    pruning and move selection phases of MinesweeperAI.
+
+    Results are kept as exclusive (self) time per call stack, which is
+    what the folded stack format read by flame graph tools expects:
+    one line per stack, frames joined by semicolons, then a weight.
+    """
+
+    def __init__(self):
+        # Open phases as [name, start time, time spent in children]
+        self.stack = []
+        self.times = dict()
+        self.calls = dict()
+
+    @contextmanager
+    def phase(self, name):
+        frame = [name, time.perf_counter(), 0.0]
+        self.stack.append(frame)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - frame[1]
+            path = tuple(f[0] for f in self.stack)
+            self.stack.pop()
+            self.times[path] = self.times.get(path, 0.0) + elapsed - frame[2]
+            self.calls[path] = self.calls.get(path, 0) + 1
+            if self.stack:
+                self.stack[-1][2] += elapsed
+
+    def merge(self, other):
+        """Adds the times recorded by another profiler."""
+        for path, seconds in other.times.items():
+            self.times[path] = self.times.get(path, 0.0) + seconds
+        for path, calls in other.calls.items():
+            self.calls[path] = self.calls.get(path, 0) + calls
+
+    def folded(self):
+        """
+        Returns the profile in folded stack format, weighted in
+        microseconds of exclusive time.
+        """
+        lines = []
+        for path in sorted(self.times):
+            microseconds = round(self.times[path] * 1e6)
+            if microseconds > 0:
+                lines.append(f"{';'.join(path)} {microseconds}")
+        return "\n".join(lines) + "\n"
+
+    def save(self, filename):
+        """Writes the profile in folded stack format."""
+        with open(filename, "w") as f:
+            f.write(self.folded())
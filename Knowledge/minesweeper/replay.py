@@ -0,0 +1,110 @@
+import json
+import sys
+
+from minesweeper import Minesweeper, MinesweeperAI
+from profiler import Profiler
+
+
+def main():
+    if len(sys.argv) not in [2, 3]:
+        sys.exit("Usage: python replay.py replay.json [profile.folded]")
+
+    replay = Replay.load(sys.argv[1])
+    profiler = Profiler() if len(sys.argv) == 3 else None
+    game, ai = replay.play(profiler=profiler)
+
+    won = len(ai.moves_made) == game.height * game.width - len(game.mines)
+    print(f"Replayed {len(replay.moves) // 3} moves, "
+          f"{'won' if won else 'lost'}.")
+    if profiler:
+        profiler.save(sys.argv[2])
+
+
+class Replay():
+    """
+    Compact log of a game: the board's size, mine count and seed, and
+    for every move the cell played and how many cells it revealed.
+    Moves are kept as a flat list of `i, j, revealed` triples.
+    """
+
+    def __init__(self, height, width, mines, seed, moves=None):
+        self.height = height
+        self.width = width
+        self.mines = mines
+        self.seed = seed
+        self.moves = moves if moves is not None else []
+
+    @classmethod
+    def start(cls, game):
+        """Starts an empty log for a game."""
+        return cls(game.height, game.width, len(game.mines), game.seed)
+
+    def record(self, move, revealed):
+        """Adds a move and the number of cells it revealed to the log."""
+        self.moves.extend([move[0], move[1], revealed])
+
+    def to_json(self):
+        return json.dumps({
+            "height": self.height,
+            "width": self.width,
+            "mines": self.mines,
+            "seed": self.seed,
+            "moves": self.moves,
+        }, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, text):
+        data = json.loads(text)
+        return cls(data["height"], data["width"], data["mines"],
+                   data["seed"], data["moves"])
+
+    def save(self, filename):
+        with open(filename, "w") as f:
+            f.write(self.to_json() + "\n")
+
+    @classmethod
+    def load(cls, filename):
+        with open(filename) as f:
+            return cls.from_json(f.read())
+
+    def play(self, profiler=None, verify=True):
+        """
+        Rebuilds the board from its seed and plays every logged move,
+        returning the game and the AI in their final state.
+
+        If `verify` is True, checks that the AI chooses each logged
+        move itself and that each move reveals the logged number of
+        cells, raising ValueError at the first difference.
+        """
+        game = Minesweeper(height=self.height, width=self.width,
+                           mines=self.mines, seed=self.seed)
+        ai = MinesweeperAI(height=self.height, width=self.width,
+                           mines=self.mines)
+        ai.profiler = profiler
+
+        for n in range(0, len(self.moves), 3):
+            move = (self.moves[n], self.moves[n + 1])
+            if verify:
+                chosen = ai.make_safe_move()
+                if chosen is None:
+                    chosen = ai.make_random_move()
+                if chosen != move:
+                    raise ValueError(
+                        f"move {n // 3}: AI chose {chosen}, log has {move}"
+                    )
+            if game.is_mine(move):
+                revealed = set()
+            else:
+                revealed = game.reveal(move) - ai.moves_made
+            if verify and len(revealed) != self.moves[n + 2]:
+                raise ValueError(
+                    f"move {n // 3}: revealed {len(revealed)} cells, "
+                    f"log has {self.moves[n + 2]}"
+                )
+            for cell in revealed:
+                ai.add_knowledge(cell, game.nearby_mines(cell))
+        return game, ai
+
+
+if __name__ == "__main__":
+    main()
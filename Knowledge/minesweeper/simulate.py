@@ -0,0 +1,154 @@
+import argparse
+import json
+import multiprocessing
+import os
+import time
+
+from minesweeper import Minesweeper, MinesweeperAI
+from profiler import Profiler
+from replay import Replay
+
+# Beginner, intermediate and expert boards as height x width x mines
+BOARDS = ["8x8x10", "16x16x40", "16x30x99"]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Play Minesweeper games with the AI, without pygame."
+    )
+    parser.add_argument("--games", type=int, default=1000,
+                        help="games to play on each board")
+    parser.add_argument("--board", action="append",
+                        help="board as HEIGHTxWIDTHxMINES, may be repeated")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed of the first game's board")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="worker processes (default: all cores)")
+    parser.add_argument("--replays", metavar="FILE",
+                        help="write a replay of every lost game, one JSON "
+                             "object per line")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="time the AI's phases and write them as "
+                             "folded stacks for a flame graph")
+    args = parser.parse_args()
+
+    results = []
+    replays = []
+    profiler = Profiler() if args.profile else None
+    for board in args.board or BOARDS:
+        height, width, mines = (int(n) for n in board.split("x"))
+        results.append(simulate(
+            args.games, height, width, mines,
+            seed=args.seed, processes=args.processes,
+            replays=replays if args.replays else None, profiler=profiler
+        ))
+    print(json.dumps(results, indent=2))
+
+    if args.replays:
+        with open(args.replays, "w") as f:
+            for replay in replays:
+                f.write(replay.to_json() + "\n")
+    if profiler:
+        profiler.save(args.profile)
+
+
+def play_game(height, width, mines, seed, profile=False):
+    """
+    Plays one game on the board generated from `seed`, the way the
+    runner's AI Move button does: a safe move if one is known,
+    otherwise a guess. Every cell a move reveals is added to the
+    AI's knowledge.
+
+    Returns whether the AI won, the seconds spent on each move
+    choosing it and adding the revealed count to the AI's knowledge,
+    the game's replay, and its Profiler if `profile` is True.
+    """
+    game = Minesweeper(height=height, width=width, mines=mines, seed=seed)
+    ai = MinesweeperAI(height=height, width=width, mines=mines)
+    ai.profiler = Profiler() if profile else None
+    replay = Replay.start(game)
+    safe_cells = height * width - mines
+    latencies = []
+
+    while True:
+        start = time.perf_counter()
+        move = ai.make_safe_move()
+        if move is None:
+            move = ai.make_random_move()
+        if move is None:
+            return ai.mines == game.mines, latencies, replay, ai.profiler
+        if game.is_mine(move):
+            replay.record(move, 0)
+            return False, latencies, replay, ai.profiler
+
+        # Cells with no neighboring mines open up their whole region
+        revealed = game.reveal(move) - ai.moves_made
+        for cell in revealed:
+            ai.add_knowledge(cell, game.nearby_mines(cell))
+        latencies.append(time.perf_counter() - start)
+        replay.record(move, len(revealed))
+
+        # Every safe cell revealed is a win, even without flags
+        if len(ai.moves_made) == safe_cells:
+            return True, latencies, replay, ai.profiler
+
+
+def simulate(games, height, width, mines, seed=0, processes=None,
+             replays=None, profiler=None):
+    """
+    Plays `games` games with seeds `seed`, `seed + 1`, ... across a pool
+    of processes and returns aggregate statistics.
+
+    If `replays` is a list, the replays of lost games are appended to
+    it. If `profiler` is a Profiler, each game's phase times are
+    merged into it.
+    """
+    processes = processes or os.cpu_count() or 1
+    chunksize = max(1, games // (4 * processes))
+    profile = profiler is not None
+    tasks = [(height, width, mines, seed + n, profile) for n in range(games)]
+
+    start = time.perf_counter()
+    with multiprocessing.Pool(processes) as pool:
+        outcomes = pool.starmap(play_game, tasks, chunksize=chunksize)
+    elapsed = time.perf_counter() - start
+
+    wins = sum(won for won, _, _, _ in outcomes)
+    latencies = sorted(
+        latency for _, game_latencies, _, _ in outcomes
+        for latency in game_latencies
+    )
+    for won, _, replay, game_profiler in outcomes:
+        if replays is not None and not won:
+            replays.append(replay)
+        if profiler is not None:
+            profiler.merge(game_profiler)
+    moves = len(latencies)
+    return {
+        "board": {"height": height, "width": width, "mines": mines},
+        "games": games,
+        "wins": wins,
+        "win_rate": wins / games if games else 0.0,
+        "moves": moves,
+        "seconds": elapsed,
+        "processes": processes,
+        "moves_per_second": moves / elapsed if elapsed else 0.0,
+        "latency_ms": {
+            "p50": percentile(latencies, 50) * 1000,
+            "p90": percentile(latencies, 90) * 1000,
+            "p99": percentile(latencies, 99) * 1000,
+            "max": percentile(latencies, 100) * 1000,
+        },
+    }
+
+
+def percentile(values, p):
+    """Returns the `p`th percentile of sorted `values` by nearest rank."""
+    if not values:
+        return 0.0
+    rank = max(1, round(p / 100 * len(values)))
+    return values[min(rank, len(values)) - 1]
+
+
+if __name__ == "__main__":
+    main()
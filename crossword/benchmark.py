@@ -0,0 +1,37 @@
+import sys
+import time
+
+from crossword import Crossword
+from generate import CrosswordCreator
+
+PUZZLES = [
+    ("data/structure0.txt", "data/words0.txt"),
+    ("data/structure1.txt", "data/words1.txt"),
+    ("data/structure1.txt", "data/words2.txt"),
+    ("data/structure2.txt", "data/words2.txt"),
+]
+
+
+def main():
+    # Puzzles may be given as pairs of structure and words files
+    args = sys.argv[1:]
+    if len(args) % 2:
+        sys.exit("Usage: python benchmark.py [structure words] ...")
+    puzzles = list(zip(args[::2], args[1::2])) or PUZZLES
+
+    print("structure             words                 inference  "
+          "solved     nodes  backtracks  seconds")
+    for structure, words in puzzles:
+        crossword = Crossword(structure, words)
+        for inference in [False, True]:
+            creator = CrosswordCreator(crossword, inference=inference)
+            start = time.perf_counter()
+            assignment = creator.solve()
+            seconds = time.perf_counter() - start
+            print(f"{structure:20}  {words:20}  {str(inference):9}  "
+                  f"{str(assignment is not None):6}  {creator.nodes:8}  "
+                  f"{creator.backtracks:10}  {seconds:7.3f}")
+
+
+if __name__ == "__main__":
+    main()
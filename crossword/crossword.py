@@ -108,26 +108,34 @@ class Crossword():
         # For any pair of variables v1, v2, their overlap is either:
         #    None, if the two variables do not overlap; or
         #    (i, j), where v1's ith character overlaps v2's jth character
-        self.overlaps = dict()
-        for v1 in self.variables:
-            for v2 in self.variables:
-                if v1 == v2:
-                    continue
-                cells1 = v1.cells
-                cells2 = v2.cells
-                intersection = set(cells1).intersection(cells2)
-                if not intersection:
-                    self.overlaps[v1, v2] = None
-                else:
-                    intersection = intersection.pop()
-                    self.overlaps[v1, v2] = (
-                        cells1.index(intersection),
-                        cells2.index(intersection)
-                    )
+        # Only real overlaps are stored, found through the variables
+        # covering each cell rather than by comparing every pair
+        self.overlaps = Overlaps()
+        covering = dict()
+        for var in self.variables:
+            for k, cell in enumerate(var.cells):
+                covering.setdefault(cell, []).append((var, k))
+        for entries in covering.values():
+            for v1, k1 in entries:
+                for v2, k2 in entries:
+                    if v1 != v2:
+                        self.overlaps[v1, v2] = (k1, k2)
+
+        # Cache each variable's overlapping variables
+        adjacent = {var: set() for var in self.variables}
+        for v1, v2 in self.overlaps:
+            adjacent[v1].add(v2)
+        self.adjacent = {
+            var: frozenset(neighbors) for var, neighbors in adjacent.items()
+        }
 
     def neighbors(self, var):
         """Given a variable, return set of overlapping variables."""
-        return set(
-            v for v in self.variables
-            if v != var and self.overlaps[v, var]
-        )
\ No newline at end of file
+        return self.adjacent[var]
+
+
+class Overlaps(dict):
+    """Overlaps by pair of variables, None for pairs that do not overlap."""
+
+    def __missing__(self, key):
+        return None
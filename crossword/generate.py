@@ -1,20 +1,68 @@
 import sys
+from bisect import bisect_left
 from collections import deque
 from crossword import *
 
 
 class CrosswordCreator():
 
-    def __init__(self, crossword):
+    def __init__(self, crossword, inference=True):
         """
         Create new CSP crossword generate.
+
+        If `inference` is True, arc consistency is maintained during
+        the search; otherwise each assignment is only checked for
+        consistency.
         """
         self.crossword = crossword
+        self.inference = inference
+
+        # Words are grouped by length, and a domain is a bitset over
+        # the words of its variable's length: bit n is set if
+        # table[length][n] is still possible
+        self.table = dict()
+        for word in sorted(self.crossword.words):
+            self.table.setdefault(len(word), []).append(word)
+
+        # masks[length][k][letter] has a bit set for each word of
+        # that length with `letter` as its kth character
+        self.masks = dict()
+        for length, words in self.table.items():
+            self.masks[length] = []
+            for k in range(length):
+                # Set bits in a byte array, since building a large
+                # integer one bit at a time copies it for every bit
+                letters = dict()
+                for n, word in enumerate(words):
+                    bits = letters.get(word[k])
+                    if bits is None:
+                        bits = letters[word[k]] = bytearray(
+                            (len(words) + 7) // 8
+                        )
+                    bits[n >> 3] |= 1 << (n & 7)
+                self.masks[length].append({
+                    letter: int.from_bytes(bits, "little")
+                    for letter, bits in letters.items()
+                })
+
         self.domains = {
-            var: self.crossword.words.copy()
+            var: self.all_words(var)
             for var in self.crossword.variables
         }
 
+        # Variables that could take the same word as each other
+        self.same_length = dict()
+        for var in self.crossword.variables:
+            self.same_length.setdefault(var.length, []).append(var)
+
+        # Domains replaced during the search, as (variable, old domain)
+        # pairs, so that backtracking can put them back
+        self.trail = []
+
+        # Values tried, and values undone, by the search
+        self.nodes = 0
+        self.backtracks = 0
+
     def letter_grid(self, assignment):
         """
         Return 2D array representing a given assignment.
@@ -99,10 +147,50 @@ class CrosswordCreator():
         (Remove any values that are inconsistent with a variable's unary
          constraints; in this case, the length of the word.)
         """
+        # Domains only ever hold words of their variable's length
         for var in self.domains:
-            for word in self.domains[var].copy():
-                if len(word) != var.length:
-                    self.domains[var].remove(word)
+            self.domains[var] &= self.all_words(var)
+
+    def all_words(self, var):
+        """Return a bitset of every word the length of `var`."""
+        return (1 << len(self.table.get(var.length, ()))) - 1
+
+    def words(self, var, domain=None):
+        """
+        Return the list of words in the domain of `var`, or in the
+        bitset `domain` over words of its length if given.
+        """
+        if domain is None:
+            domain = self.domains[var]
+        table = self.table.get(var.length, ())
+        bits = bin(domain)[:1:-1]
+        words = []
+        n = bits.find("1")
+        while n != -1:
+            words.append(table[n])
+            n = bits.find("1", n + 1)
+        return words
+
+    def size(self, var):
+        """Return the number of words in the domain of `var`."""
+        return self.domains[var].bit_count()
+
+    def restrict(self, var, domain):
+        """
+        Replace the domain of `var` with `domain`, recording the old
+        domain on the trail. Return True if the domain changed.
+        """
+        if domain == self.domains[var]:
+            return False
+        self.trail.append((var, self.domains[var]))
+        self.domains[var] = domain
+        return True
+
+    def undo(self, mark):
+        """Restore domains replaced since the trail had length `mark`."""
+        while len(self.trail) > mark:
+            var, domain = self.trail.pop()
+            self.domains[var] = domain
 
     def revise(self, x, y):
         """
@@ -113,20 +201,16 @@ class CrosswordCreator():
         Return True if a revision was made to the domain of `x`; return
         False if no revision was made.
         """
-        revised = False
         i, j = self.crossword.overlaps[x, y]
-        for x_word in self.domains[x].copy():
-            has_overlap = False
-            for y_word in self.domains[y]:
-                # See if an x_word matches with a y_word at the overlap
-                if x_word[i] == y_word[j]:
-                    has_overlap = True
-
-            if not has_overlap:
-                self.domains[x].remove(x_word)
-                revised = True
+        # An x-word survives only if some y-word has its letter at the
+        # overlap, so the x-words allowed are a union over y's letters
+        x_masks = self.masks[x.length][i]
+        allowed = 0
+        for letter, y_mask in self.masks[y.length][j].items():
+            if self.domains[y] & y_mask and letter in x_masks:
+                allowed |= x_masks[letter]
 
-        return revised
+        return self.restrict(x, self.domains[x] & allowed)
 
     def ac3(self, arcs=None):
         """
@@ -138,24 +222,29 @@ class CrosswordCreator():
         return False if one or more domains end up empty.
         """
         # Build a list of arcs to queue
-        arcs = list()
-        for var in self.crossword.variables:
-            for neighbor in self.crossword.neighbors(var):
-                arcs.append((var, neighbor))
-
-        # I'm using the built-in deque to avoid writing an extra class
+        if arcs is None:
+            arcs = list()
+            for var in self.crossword.variables:
+                for neighbor in self.crossword.neighbors(var):
+                    arcs.append((var, neighbor))
+
+        # I'm using the built-in deque to avoid writing an extra class,
+        # with a set of the arcs in it so membership checks are quick
         arc_queue = deque(arcs)
+        queued = set(arc_queue)
         # Follows the structure of the pseudocode provided in lecture
         while len(arc_queue) != 0:
             x, y = arc_queue.popleft()
+            queued.remove((x, y))
             if self.revise(x, y):
-                if len(self.domains[x]) == 0:
+                if self.domains[x] == 0:
                     return False
                 neighbors = self.crossword.neighbors(x)
                 for z in neighbors:
                     # Update the other arcs with new info
-                    if (z, x) not in arc_queue:
+                    if z != y and (z, x) not in queued:
                         arc_queue.append((z, x))
+                        queued.add((z, x))
         return True
 
     def assignment_complete(self, assignment):
@@ -206,24 +295,25 @@ class CrosswordCreator():
         """
         # elim_count is the number of options a word eliminates
         # for neighboring vars
+        assigned = set(assignment.values())
         elim_count = {
-            word: 0 for word in self.domains[var]
+            word: 0 for word in self.words(var)
             # Ignore assigned words
-            if word not in assignment.values()
+            if word not in assigned
         }
 
         for y_var in self.crossword.neighbors(var):
             i, j = self.crossword.overlaps[var, y_var]
-            """
-            Alternatively, I could've grouped words with
-            the same character positions for each iteration,
-            but it became a bunch of list management which
-            seemed convoluted and memory inefficient
-            """
+            # A word rules out every y-word without its letter at the
+            # overlap, so count the y-words with each letter there
+            y_domain = self.domains[y_var]
+            matching = {
+                letter: (y_domain & mask).bit_count()
+                for letter, mask in self.masks[y_var.length][j].items()
+            }
+            y_words = y_domain.bit_count()
             for x_word in elim_count:
-                for y_word in self.domains[y_var]:
-                    if x_word[i] != y_word[j]:
-                        elim_count[x_word] += 1
+                elim_count[x_word] += y_words - matching.get(x_word[i], 0)
 
         # This function will return a list of words sorted
         # based on their elimination count
@@ -247,11 +337,11 @@ class CrosswordCreator():
                 # The default for the first iteration
                 chosen = var
 
-            if len(self.domains[var]) < len(self.domains[chosen]):
+            if self.size(var) < self.size(chosen):
                 # Choose the var with less words in domain
                 chosen = var
 
-            if len(self.domains[var]) == len(self.domains[chosen]):
+            if self.size(var) == self.size(chosen):
                 chosen_neighbors = len(self.crossword.neighbors(chosen))
                 # Choose the var with more neighbors
                 if len(self.crossword.neighbors(var)) > chosen_neighbors:
@@ -259,6 +349,37 @@ class CrosswordCreator():
 
         return chosen
 
+    def assign(self, var, value, assignment):
+        """
+        Narrow the domain of `var` to `value`, take `value` out of the
+        domains of the other unassigned variables, since no word may
+        be used twice, and restore arc consistency from the changed
+        variables.
+
+        Return False if some domain ends up empty.
+        """
+        bit = self.domains[var] & self.word_mask(var, value)
+        if not bit:
+            return False
+        self.restrict(var, bit)
+
+        changed = [var]
+        for other in self.same_length[var.length]:
+            if other is var or other in assignment:
+                continue
+            if self.restrict(other, self.domains[other] & ~bit):
+                if self.domains[other] == 0:
+                    return False
+                changed.append(other)
+
+        return self.ac3([
+            (z, x) for x in changed for z in self.crossword.neighbors(x)
+        ])
+
+    def word_mask(self, var, word):
+        """Return the bitset holding just `word` among words like `var`."""
+        return 1 << bisect_left(self.table[var.length], word)
+
     def backtrack(self, assignment):
         """
         Using Backtracking Search, take as input a partial assignment for the
@@ -266,21 +387,31 @@ class CrosswordCreator():
 
         `assignment` is a mapping from variables (keys) to words (values).
 
+        After each assignment, arc consistency is restored from the
+        assigned variable (maintaining arc consistency). Domains pruned
+        by it are put back from the trail if the value fails.
+
         If no assignment is possible, return None.
         """
         if self.assignment_complete(assignment):
             return assignment
         var = self.select_unassigned_variable(assignment)
         for value in self.order_domain_values(var, assignment):
-            # Put value in before consistence check to see if
-            # value is consistent with whole assignment
+            self.nodes += 1
+            mark = len(self.trail)
             assignment[var] = value
-            if self.consistent(assignment):
+            if self.inference:
+                viable = self.assign(var, value, assignment)
+            else:
+                viable = self.consistent(assignment)
+            if viable:
                 result = self.backtrack(assignment)
                 if result is not None:
                     return result
-            # Otherwise, remove
-            assignment[var] = None
+            # Otherwise, remove the value and what it pruned
+            self.backtracks += 1
+            del assignment[var]
+            self.undo(mark)
         return None
 
 
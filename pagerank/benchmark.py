@@ -0,0 +1,153 @@
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import crawler
+import generate
+from engine import LinkGraph, power_iteration, METHODS
+from pagerank import crawl, sample_pagerank, iterate_pagerank, DAMPING
+
+DAMPINGS = [0.85, 0.95, 0.99]
+TOLERANCE = 1e-8
+SIZES = [1000, 10000, 100000, 1000000]
+STAGES = ["crawl", "recrawl", "sample", "iterate"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PageRank.")
+    suites = parser.add_subparsers(dest="suite", required=True)
+
+    solvers = suites.add_parser(
+        "solvers", help="compare iterative solvers' convergence"
+    )
+    solvers.add_argument("corpora", nargs="*",
+                         default=["corpus0", "corpus1", "corpus2", "100000"],
+                         help="corpus directories, or a number of pages "
+                              "for a generated power-law corpus")
+
+    scale = suites.add_parser(
+        "scale", help="time crawling, sampling and iteration on "
+                      "generated corpora"
+    )
+    scale.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    scale.add_argument("--degree", type=float, default=8)
+    scale.add_argument("--dangling", type=float, default=0.1)
+    scale.add_argument("--samples", type=int, default=100000)
+    scale.add_argument("--seed", type=int, default=0)
+    scale.add_argument("--directory", default=None,
+                       help="where to write corpora (default: a "
+                            "temporary directory)")
+    args = parser.parse_args()
+
+    if args.suite == "solvers":
+        compare_solvers(args.corpora)
+    else:
+        with tempfile.TemporaryDirectory() as temporary:
+            compare_sizes(args, args.directory or temporary)
+
+
+def compare_solvers(corpora):
+    """Prints each solver's iterations, time and error by damping."""
+    print("corpus      pages  damping  method        iterations  "
+          "seconds     error")
+    for name in corpora:
+        if name.isdigit():
+            pages = int(name)
+            graph = LinkGraph(range(pages), *generate.power_law_graph(pages))
+        else:
+            graph = LinkGraph.from_corpus(crawl(name))
+        for damping in DAMPINGS:
+            exact, _ = power_iteration(graph, damping, 1e-14, 100000)
+            for method in METHODS:
+                start = time.perf_counter()
+                ranks, iterations = power_iteration(
+                    graph, damping, TOLERANCE, method=method
+                )
+                seconds = time.perf_counter() - start
+                error = np.abs(ranks - exact).sum()
+                print(f"{name:9} {len(graph):7}  {damping:7}  "
+                      f"{method:12}  {iterations:10}  {seconds:7.3f}  "
+                      f"{error:.2e}")
+
+
+def compare_sizes(args, root):
+    """
+    Generates a power-law corpus of HTML pages for each size, then
+    times each stage of pagerank.py on it and the memory it allocates.
+    """
+    print("   pages    links  stage     seconds   peak(MB)")
+    for pages in args.sizes:
+        directory = os.path.join(root, f"corpus{pages}")
+        sources, targets = generate.power_law_graph(
+            pages, args.degree, args.dangling, args.seed
+        )
+        if not os.path.isdir(directory):
+            generate.write_html(directory, pages, sources, targets)
+
+        for stage in STAGES:
+            seconds, peak = measure(stage, directory, args.samples,
+                                    args.seed)
+            print(f"{pages:8} {len(sources):8}  {stage:8} "
+                  f"{seconds:8.2f} {peak:10.1f}")
+
+
+def measure(stage, directory, samples, seed):
+    """
+    Runs one stage twice, each time in a fresh process: once to time
+    it, and once under tracemalloc to find the peak memory the stage
+    itself allocates, not counting a corpus crawled before it, as
+    tracing slows it down. Returns its seconds and peak MB.
+    """
+    seconds, _ = in_process(run_stage, stage, directory, samples, seed)
+    _, peak = in_process(run_stage, stage, directory, samples, seed, True)
+    return seconds, peak
+
+
+def in_process(function, *args):
+    """Calls a function in a new process and returns its result."""
+    # Not a multiprocessing.Pool, whose daemon workers cannot start
+    # the pool crawl uses for large corpora
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        return executor.submit(function, *args).result()
+
+
+def run_stage(stage, directory, samples, seed, trace=False):
+    """
+    Runs one stage: a crawl with no cached links, a crawl reusing
+    them, or sampling or iteration on the crawled corpus, which is
+    neither timed nor traced. Returns the seconds taken and, if
+    `trace`, the peak MB allocated while tracing.
+
+    tracemalloc only sees this process, so a traced crawl parses every
+    page here rather than in a pool, and its peak includes parsing.
+    """
+    if stage == "crawl":
+        cache = os.path.join(directory, crawler.CACHE_NAME)
+        if os.path.exists(cache):
+            os.remove(cache)
+    if stage in ["sample", "iterate"]:
+        corpus = crawl(directory)
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    if stage in ["crawl", "recrawl"]:
+        crawler.crawl(directory, processes=1 if trace else None)
+    elif stage == "sample":
+        sample_pagerank(corpus, DAMPING, samples, seed=seed)
+    else:
+        iterate_pagerank(corpus, DAMPING)
+    seconds = time.perf_counter() - start
+    peak = 0.0
+    if trace:
+        peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+    return seconds, peak
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+import multiprocessing
+import os
+from html.parser import HTMLParser
+
+import numpy as np
+
+# Bytes of a page read and parsed at a time
+CHUNK = 64 * 1024
+# Pages to parse before it is worth starting worker processes
+PARALLEL_MIN = 1000
+# Link graph cache kept in the corpus directory
+CACHE_NAME = ".links.npz"
+
+
+class LinkParser(HTMLParser):
+    """
+    Collects the targets of <a href="..."> tags from HTML fed to it in
+    pieces, so that a page never has to be held in memory whole.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.links = set()
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            for name, value in attrs:
+                if name == "href" and value is not None:
+                    self.links.add(value)
+
+
+def extract_links(path):
+    """Returns the set of links on the HTML page at `path`."""
+    parser = LinkParser()
+    with open(path, encoding="utf-8", errors="replace") as f:
+        while chunk := f.read(CHUNK):
+            parser.feed(chunk)
+    parser.close()
+    return parser.links
+
+
+def crawl(directory, processes=None, cache=True):
+    """
+    Parse a directory of HTML pages and check for links to other pages.
+    Return a dictionary where each key is a page, and values are
+    a set of all other pages in the corpus that are linked to by the page.
+
+    Pages are parsed across `processes` worker processes when there
+    are many of them. If `cache` is True, every page's links are saved
+    alongside the pages, and pages whose modification time and size
+    are unchanged since the last crawl are not parsed again.
+    """
+    cache_path = os.path.join(directory, CACHE_NAME) if cache else None
+    cached = load_cache(cache_path) if cache_path else dict()
+
+    # Reuse the links of every page that has not changed
+    stats = dict()
+    links = dict()
+    for entry in os.scandir(directory):
+        if not entry.name.endswith(".html") or not entry.is_file():
+            continue
+        stat = entry.stat()
+        stats[entry.name] = (stat.st_mtime_ns, stat.st_size)
+        previous = cached.get(entry.name)
+        if previous and previous[0] == stats[entry.name]:
+            links[entry.name] = previous[1]
+
+    stale = [filename for filename in stats if filename not in links]
+    paths = [os.path.join(directory, filename) for filename in stale]
+    if len(stale) >= PARALLEL_MIN and processes != 1:
+        processes = processes or os.cpu_count() or 1
+        chunksize = max(1, len(paths) // (4 * processes))
+        with multiprocessing.Pool(processes) as pool:
+            parsed = pool.map(extract_links, paths, chunksize=chunksize)
+    else:
+        parsed = map(extract_links, paths)
+    links.update(zip(stale, parsed))
+
+    if cache_path and (stale or len(cached) != len(stats)):
+        try:
+            save_cache(cache_path, {
+                filename: (stats[filename], links[filename])
+                for filename in stats
+            })
+        except OSError:
+            pass
+
+    # Only include links to other pages in the corpus
+    return {
+        filename: set(
+            link for link in links[filename]
+            if link in links and link != filename
+        )
+        for filename in links
+    }
+
+
+def save_cache(path, pages):
+    """
+    Saves a dict mapping each page to its `(mtime, size)` and links
+    as a compressed edge list: one table of names, and each page's
+    links as a slice of an array of indices into it.
+    """
+    names = dict()
+    for filename, (_, page_links) in pages.items():
+        names.setdefault(filename, len(names))
+        for link in page_links:
+            names.setdefault(link, len(names))
+
+    files = list(pages)
+    stats = [pages[f][0] for f in files]
+    offsets = np.zeros(len(files) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(pages[f][1]) for f in files])
+    targets = np.fromiter(
+        (names[link] for f in files for link in pages[f][1]),
+        dtype=np.int32, count=int(offsets[-1])
+    )
+
+    # Write through a temporary file so a crash never leaves half a cache
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as f:
+        np.savez_compressed(
+            f,
+            names=np.array(list(names), dtype=str),
+            files=np.array([names[f] for f in files], dtype=np.int32),
+            mtimes=np.array([mtime for mtime, _ in stats], dtype=np.int64),
+            sizes=np.array([size for _, size in stats], dtype=np.int64),
+            offsets=offsets,
+            targets=targets,
+        )
+    os.replace(temporary, path)
+
+
+def load_cache(path):
+    """
+    Loads a cache written by save_cache, returning an empty dict if
+    there is none or it cannot be read.
+    """
+    try:
+        with np.load(path) as data:
+            names = data["names"].tolist()
+            files = data["files"].tolist()
+            mtimes = data["mtimes"].tolist()
+            sizes = data["sizes"].tolist()
+            offsets = data["offsets"].tolist()
+            targets = data["targets"].tolist()
+    except (OSError, ValueError, KeyError):
+        return dict()
+
+    return {
+        names[name]: (
+            (mtimes[n], sizes[n]),
+            set(names[t] for t in targets[offsets[n]:offsets[n + 1]])
+        )
+        for n, name in enumerate(files)
+    }
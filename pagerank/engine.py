@@ -0,0 +1,220 @@
+import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import spsolve_triangular
+
+DAMPING = 0.85
+# Largest change in the rank vector at which iteration stops
+TOLERANCE = 1e-6
+MAX_ITERATIONS = 1000
+# Iterations between extrapolations by the "aitken" and "quadratic" methods
+EXTRAPOLATION_PERIOD = 10
+
+
+class LinkGraph():
+    """
+    Corpus stored as a sparse transition matrix.
+
+    `matrix[i, j]` is the chance that a surfer on page j follows its
+    link to page i, so a rank vector is advanced with one sparse
+    matrix-vector product. Pages with no links are treated as linking
+    to every page; rather than fill in those N columns, their rank is
+    spread evenly as a single rank-one term.
+    """
+
+    def __init__(self, pages, sources, targets):
+        """
+        Builds the graph from a list of page names and two parallel
+        arrays of page indices, one entry per link.
+        """
+        self.pages = list(pages)
+        self.index = {page: i for i, page in enumerate(self.pages)}
+        n = len(self.pages)
+        sources = np.asarray(sources, dtype=np.int32)
+        targets = np.asarray(targets, dtype=np.int32)
+
+        out_degree = np.bincount(sources, minlength=n)
+        self.dangling = np.flatnonzero(out_degree == 0)
+        weights = 1 / out_degree[sources]
+        self.matrix = sparse.csr_matrix(
+            (weights, (targets, sources)), shape=(n, n)
+        )
+        self._columns = None
+
+    @classmethod
+    def from_corpus(cls, corpus):
+        """Builds the graph from a dict mapping pages to linked pages."""
+        pages = list(corpus)
+        index = {page: i for i, page in enumerate(pages)}
+        edges = sum(len(links) for links in corpus.values())
+        sources = np.fromiter(
+            (index[page] for page in pages for _ in corpus[page]),
+            dtype=np.int32, count=edges
+        )
+        targets = np.fromiter(
+            (index[link] for page in pages for link in corpus[page]),
+            dtype=np.int32, count=edges
+        )
+        return cls(pages, sources, targets)
+
+    def __len__(self):
+        return len(self.pages)
+
+    def columns(self):
+        """
+        Returns the transition matrix in compressed column form, where
+        column j lists the pages j links to, built on first use.
+        """
+        if self._columns is None:
+            self._columns = self.matrix.tocsc()
+        return self._columns
+
+    def step(self, ranks, damping):
+        """Returns the rank vector after one more click by the surfer."""
+        n = len(self.pages)
+        dangling = ranks[self.dangling].sum()
+        return (damping * (self.matrix @ ranks + dangling / n)
+                + (1 - damping) / n)
+
+    def ranks(self, vector):
+        """Returns a rank vector as a dict from page names to ranks."""
+        return dict(zip(self.pages, vector.tolist()))
+
+
+def power_iteration(graph, damping=DAMPING, tolerance=TOLERANCE,
+                    max_iterations=MAX_ITERATIONS, start=None,
+                    method="jacobi", norm="l1", history=None):
+    """
+    Iterates on `graph` until the change between iterations, measured
+    by `norm` (see NORMS), is at most `tolerance`, or for
+    `max_iterations` iterations. Starts from the rank vector `start`
+    if given, and from uniform ranks otherwise.
+
+    `method` is one of METHODS: "jacobi" for the plain power method,
+    "gauss-seidel" to use each page's new rank as soon as it is known,
+    or "aitken" or "quadratic" to extrapolate power iterations every
+    EXTRAPOLATION_PERIOD iterations. An extrapolation that makes the
+    next change larger is undone, and no more are tried. If `history`
+    is a list, the change in each iteration is appended to it.
+
+    Returns the rank vector and the number of iterations run.
+    """
+    if method not in METHODS:
+        raise ValueError(f"unknown method {method}")
+    if norm not in NORMS:
+        raise ValueError(f"unknown norm {norm}")
+    step = gauss_seidel(graph, damping) if method == "gauss-seidel" else (
+        lambda ranks: graph.step(ranks, damping)
+    )
+    extrapolate = EXTRAPOLATIONS.get(method)
+    distance = NORMS[norm]
+
+    n = len(graph)
+    ranks = np.full(n, 1 / n) if start is None else start
+    recent = [ranks]
+    # Iterate replaced by the last extrapolation, and its change
+    fallback = None
+    iteration = 0
+    while iteration < max_iterations:
+        new_ranks = step(ranks)
+        change = distance(new_ranks - ranks)
+        iteration += 1
+
+        # Undo an extrapolation that slowed convergence, and stop
+        # extrapolating since it does not suit this graph
+        if fallback is not None:
+            if change > fallback[1] and iteration < max_iterations:
+                # The discarded iteration still counts, so record it
+                if history is not None:
+                    history.append(change)
+                extrapolate = None
+                ranks = fallback[0]
+                new_ranks = step(ranks)
+                change = distance(new_ranks - ranks)
+                iteration += 1
+            fallback = None
+
+        ranks = new_ranks
+        if history is not None:
+            history.append(change)
+        if change <= tolerance:
+            break
+
+        # Extrapolate from the last few iterates every so often
+        if extrapolate:
+            recent = recent[-3:] + [ranks]
+            if iteration % EXTRAPOLATION_PERIOD == 0:
+                fallback = (ranks, change)
+                ranks = extrapolate(recent)
+                recent = [ranks]
+    return ranks, iteration
+
+
+def gauss_seidel(graph, damping):
+    """
+    Returns a function that sweeps once over the pages of `graph`,
+    using each new rank as soon as it is computed.
+
+    Each sweep is a sparse triangular solve. The rank held by pages
+    with no links is taken from the previous sweep, and the result is
+    scaled to sum to 1, which leaves PageRank as the fixed point.
+    """
+    n = len(graph)
+    lower = sparse.tril(graph.matrix, format="csr")
+    upper = sparse.triu(graph.matrix, k=1, format="csr")
+    system = (sparse.identity(n, format="csr") - damping * lower).tocsr()
+
+    def sweep(ranks):
+        jump = (damping * ranks[graph.dangling].sum() + 1 - damping) / n
+        new_ranks = spsolve_triangular(
+            system, damping * (upper @ ranks) + jump, lower=True
+        )
+        return new_ranks / new_ranks.sum()
+    return sweep
+
+
+def aitken(recent):
+    """
+    Aitken delta-squared extrapolation of each page's rank from the
+    last three iterates, after Kamvar et al. (2003). Pages where it
+    is undefined or not positive keep their latest rank.
+    """
+    x0, x1, x2 = recent[-3:]
+    curvature = x2 - 2 * x1 + x0
+    ranks = x2.copy()
+    defined = curvature != 0
+    ranks[defined] = (x0[defined] - (x1[defined] - x0[defined]) ** 2
+                      / curvature[defined])
+    invalid = ~(ranks > 0)
+    ranks[invalid] = x2[invalid]
+    return ranks / ranks.sum()
+
+
+def quadratic(recent):
+    """
+    Quadratic extrapolation from the last four iterates, after Kamvar
+    et al. (2003): fits the iterates as mixtures of the top three
+    eigenvectors and removes the second and third.
+    """
+    x0, x1, x2, x3 = recent[-4:]
+    y = np.column_stack([x1 - x0, x2 - x0])
+    gamma, *_ = np.linalg.lstsq(y, -(x3 - x0), rcond=None)
+    beta0 = gamma[0] + gamma[1] + 1
+    beta1 = gamma[1] + 1
+    ranks = beta0 * x1 + beta1 * x2 + x3
+    if not np.all(np.isfinite(ranks)) or ranks.sum() <= 0:
+        return x3
+    return ranks / ranks.sum()
+
+
+NORMS = {
+    "l1": lambda change: np.abs(change).sum(),
+    "l2": lambda change: np.sqrt(change @ change),
+    "max": lambda change: np.abs(change).max(),
+}
+
+EXTRAPOLATIONS = {
+    "aitken": aitken,
+    "quadratic": quadratic,
+}
+
+METHODS = ["jacobi", "gauss-seidel", "aitken", "quadratic"]
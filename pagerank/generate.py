@@ -0,0 +1,107 @@
+import argparse
+import os
+
+import numpy as np
+
+from outofcore import write_edges
+
+# Power-law exponents of the out-link and in-link degree distributions,
+# close to those measured on the web
+OUT_EXPONENT = 2.7
+IN_EXPONENT = 2.1
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic power-law web graph."
+    )
+    parser.add_argument("--pages", type=int, default=10000)
+    parser.add_argument("--degree", type=float, default=8,
+                        help="average links per page with links")
+    parser.add_argument("--dangling", type=float, default=0.1,
+                        help="fraction of pages with no links")
+    parser.add_argument("--seed", type=int, default=0)
+    output = parser.add_mutually_exclusive_group(required=True)
+    output.add_argument("--html", metavar="DIRECTORY",
+                        help="write one HTML page per page, for crawl")
+    output.add_argument("--edges", metavar="FILE",
+                        help="write a binary edge file, for outofcore")
+    args = parser.parse_args()
+
+    sources, targets = power_law_graph(args.pages, args.degree,
+                                       args.dangling, args.seed)
+    if args.html:
+        write_html(args.html, args.pages, sources, targets)
+    else:
+        write_edges(args.edges, sources, targets)
+    print(f"{args.pages} pages, {len(sources)} links")
+
+
+def power_law_graph(pages, degree=8, dangling=0.1, seed=0):
+    """
+    Returns the links of a random graph of `pages` pages as arrays of
+    source and target page indices, sorted by source then target.
+
+    A `dangling` fraction of pages have no links. The rest have a
+    number of links drawn from a power law with mean `degree`, and
+    link to pages drawn with power-law popularity, so that a few
+    pages have most of the in-links as on the web. Duplicate links
+    and links from a page to itself are dropped, so the mean comes
+    out slightly under `degree`.
+    """
+    rng = np.random.default_rng(seed)
+
+    # Pareto out-degrees scaled to the mean, capped at the corpus size
+    shape = OUT_EXPONENT - 1
+    minimum = degree * (shape - 1) / shape
+    out_degree = np.floor(minimum * (rng.pareto(shape, pages) + 1))
+    out_degree = np.minimum(out_degree, pages - 1).astype(np.int64)
+    out_degree[rng.random(pages) < dangling] = 0
+    sources = np.repeat(np.arange(pages, dtype=np.int64), out_degree)
+
+    # Zipf popularity over a random order of the pages
+    popularity = np.arange(1, pages + 1) ** (-1 / (IN_EXPONENT - 1))
+    cumulative = np.cumsum(popularity)
+    ranked = rng.permutation(pages)
+    targets = ranked[np.searchsorted(
+        cumulative, rng.random(len(sources)) * cumulative[-1]
+    )]
+
+    keys = np.unique(sources * pages + targets)
+    sources, targets = keys // pages, keys % pages
+    keep = sources != targets
+    return sources[keep].astype(np.int32), targets[keep].astype(np.int32)
+
+
+def write_html(directory, pages, sources, targets):
+    """
+    Writes the graph as `pages` HTML files named 0.html, 1.html, ...,
+    each linking to its targets, in `directory`.
+    """
+    os.makedirs(directory, exist_ok=True)
+    ends = np.searchsorted(sources, np.arange(1, pages + 1))
+    start = 0
+    for page in range(pages):
+        links = "\n".join(
+            f'    <a href="{target}.html">Page {target}</a>'
+            for target in targets[start:ends[page]].tolist()
+        )
+        start = ends[page]
+        with open(os.path.join(directory, f"{page}.html"), "w") as f:
+            f.write("<!DOCTYPE html>\n<html lang=\"en\">\n"
+                    f"<head><title>Page {page}</title></head>\n"
+                    f"<body>\n<h1>Page {page}</h1>\n{links}\n"
+                    "</body>\n</html>\n")
+
+
+def corpus(pages, sources, targets):
+    """Returns the graph as a corpus, as crawl would read it."""
+    names = [f"{page}.html" for page in range(pages)]
+    corpus = {name: set() for name in names}
+    for source, target in zip(sources.tolist(), targets.tolist()):
+        corpus[names[source]].add(names[target])
+    return corpus
+
+
+if __name__ == "__main__":
+    main()
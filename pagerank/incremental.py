@@ -0,0 +1,249 @@
+import random
+import sys
+import time
+import numpy as np
+
+import generate
+from engine import LinkGraph, power_iteration
+from engine import DAMPING, TOLERANCE, MAX_ITERATIONS
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    edits = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    corpus = generate.corpus(n, *generate.power_law_graph(n))
+    graph = LinkGraph.from_corpus(corpus)
+    previous = graph.ranks(power_iteration(graph, DAMPING, 1e-12)[0])
+
+    # Rewrite the links of a few pages, add one page and remove another
+    rng = random.Random(1)
+    pages = list(corpus)
+    changes = {
+        page: set(rng.sample(pages, 5)) - {page}
+        for page in rng.sample(pages, edits)
+    }
+    changes[f"new{n}"] = set(rng.sample(pages, 5))
+    changes[pages[-1]] = None
+    new_corpus, changed = apply_changes(corpus, changes)
+    graph = LinkGraph.from_corpus(new_corpus)
+    start = warm_start(graph, previous)
+    seed = push_start(graph, corpus, previous, changed, DAMPING)
+    exact, _ = power_iteration(graph, DAMPING, 1e-13)
+    print(f"{n} pages, {len(changes)} changed")
+
+    print("tolerance  method  iterations   pushes  seconds     error")
+    for tolerance in [1e-4, 1e-6, 1e-8]:
+        for method in ["cold", "warm", "push"]:
+            begin = time.perf_counter()
+            if method == "push":
+                ranks, pushes = local_push(graph, *seed, DAMPING,
+                                           tolerance)
+                iterations = "-"
+            else:
+                ranks, iterations = power_iteration(
+                    graph, DAMPING, tolerance,
+                    start=start if method == "warm" else None
+                )
+                pushes = "-"
+            seconds = time.perf_counter() - begin
+            error = np.abs(ranks - exact).sum()
+            print(f"{tolerance:9.0e}  {method:6}  {iterations:>10}  "
+                  f"{pushes:>7}  {seconds:7.3f}  {error:.2e}")
+
+
+def apply_changes(corpus, changes):
+    """
+    Returns a copy of `corpus` with `changes` applied, and the set of
+    pages whose links changed. `changes` maps each added or edited
+    page to its new set of links, and each removed page to None. Links
+    to pages not in the new corpus are dropped, which changes the
+    pages that had them too.
+    """
+    corpus = dict(corpus)
+    changed = set(changes)
+    removed = set()
+    for page, links in changes.items():
+        if links is None:
+            corpus.pop(page, None)
+            removed.add(page)
+        else:
+            corpus[page] = set()
+
+    # Filter links once every page is added or removed
+    for page, links in changes.items():
+        if links is not None:
+            corpus[page] = {
+                link for link in links if link in corpus and link != page
+            }
+    if removed:
+        for page, links in corpus.items():
+            if not links.isdisjoint(removed):
+                corpus[page] = links - removed
+                changed.add(page)
+    return corpus, changed
+
+
+def warm_start(graph, previous):
+    """
+    Returns a starting rank vector for `graph` from the ranks of a
+    previous corpus, giving new pages the average rank.
+    """
+    n = len(graph)
+    ranks = np.fromiter(
+        (previous.get(page, 1 / n) for page in graph.pages),
+        dtype=float, count=n
+    )
+    return ranks / ranks.sum()
+
+
+def update_pagerank(corpus, previous, changes, damping_factor,
+                    tolerance=TOLERANCE, max_iterations=MAX_ITERATIONS,
+                    method="power"):
+    """
+    Applies `changes` (see apply_changes) to `corpus` and ranks the
+    result, starting from the ranks `previous` of the old corpus. With
+    `previous` None, ranks from a uniform start instead.
+
+    `method` is "power" to run power iteration from the old ranks, or
+    "push" to correct the old ranks locally with local_push, which is
+    faster when few pages change. Push assumes `previous` converged.
+
+    Returns the new corpus, its ranks, and the number of iterations
+    or pushes taken.
+    """
+    new_corpus, changed = apply_changes(corpus, changes)
+    graph = LinkGraph.from_corpus(new_corpus)
+    if method == "push" and previous is not None:
+        ranks, work = local_push(
+            graph, *push_start(graph, corpus, previous, changed,
+                               damping_factor),
+            damping_factor, tolerance, max_iterations
+        )
+    elif method in ["power", "push"]:
+        start = None if previous is None else warm_start(graph, previous)
+        ranks, work = power_iteration(graph, damping_factor, tolerance,
+                                      max_iterations, start=start)
+    else:
+        raise ValueError(f"unknown method {method}")
+    return new_corpus, graph.ranks(ranks), work
+
+
+def push_start(graph, corpus, previous, changed, damping):
+    """
+    Returns a start vector for local_push, and the residual it leaves
+    as arrays of page indices and amounts, from the converged ranks
+    `previous` of the old `corpus`. `changed` holds every page whose
+    links changed, as returned by apply_changes.
+
+    Leaving out the pages with no links, the ranks are proportional to
+    the solution x of x = damping * P x + c for any constant c, where
+    P follows links: jumps from pages with no links and random jumps
+    both land uniformly, so they only scale x. With c the uniform term
+    of the old ranks, the old ranks still solve the new equations
+    except where a changed page's old or new links lead, so the
+    residual starts at those pages alone. New pages start at c, the
+    rank of a page that nothing links to.
+    """
+    n = len(graph)
+    start = np.fromiter(
+        (previous.get(page, 0.0) for page in graph.pages),
+        dtype=float, count=n
+    )
+
+    # Old rank held by pages with no links, found from the unchanged
+    # ones with no links now and the changed ones with none before
+    indices = np.fromiter(
+        (graph.index[page] for page in changed if page in graph.index),
+        dtype=np.int64
+    )
+    was_changed = np.zeros(n, dtype=bool)
+    was_changed[indices] = True
+    dangling = graph.dangling[~was_changed[graph.dangling]]
+    held = start[dangling].sum() + sum(
+        previous[page] for page in changed
+        if page in corpus and not corpus[page]
+    )
+    jump = (1 - damping + damping * held) / len(corpus)
+    start[[graph.index[page] for page in changed
+           if page in graph.index and page not in corpus]] = jump
+
+    # Take back what each changed page passed along its old links, and
+    # pass it along its new ones
+    pages, amounts = [], []
+    for page in changed:
+        links = [link for link in corpus.get(page, ()) if link in graph.index]
+        if links:
+            share = damping * previous[page] / len(corpus[page])
+            pages.extend(graph.index[link] for link in links)
+            amounts.extend([-share] * len(links))
+    columns = graph.columns()
+    for page in indices.tolist():
+        begin, end = columns.indptr[page], columns.indptr[page + 1]
+        pages.extend(columns.indices[begin:end].tolist())
+        amounts.extend(
+            (damping * start[page] * columns.data[begin:end]).tolist()
+        )
+    return start, np.array(pages, dtype=np.int64), np.array(amounts)
+
+
+def local_push(graph, start, pages, amounts, damping, tolerance=TOLERANCE,
+               max_rounds=MAX_ITERATIONS):
+    """
+    Corrects the vector `start` by pushing its residual, the amount by
+    which each page misses the equation described in push_start, given
+    as `amounts` at `pages`; every other page must already satisfy it.
+
+    Pushing a page moves its residual into its rank and passes
+    `damping` times it on to the pages it links to. In each round every
+    page whose residual is still large is pushed at once. The pages
+    to check next are the ones just pushed to, so only the links out
+    of pages near a change are followed and no round scans every page.
+    Stops once the remaining residual, whose L1 norm is tracked as
+    pages are pushed, bounds the L1 error of the ranks by `tolerance`.
+
+    Returns the ranks, scaled to sum to 1, and the number of pushes
+    made.
+    """
+    n = len(graph)
+    ranks = start.copy()
+    residual = np.zeros(n)
+    np.add.at(residual, pages, amounts)
+    threshold = (1 - damping) * tolerance / n
+    columns = graph.columns()
+
+    # L1 norm of the residual, kept up to date from the pages each
+    # round touches, so that pushing can stop as soon as it is small
+    active = np.unique(pages)
+    remaining = np.abs(residual[active]).sum()
+    pushes = 0
+    for _ in range(max_rounds):
+        active = active[np.abs(residual[active]) > threshold]
+        if len(active) == 0 or remaining <= (1 - damping) * tolerance:
+            break
+        pushed = residual[active]
+        ranks[active] += pushed
+        residual[active] = 0.0
+        remaining -= np.abs(pushed).sum()
+        pushes += len(active)
+
+        # Positions in the column arrays of every link out of the
+        # pushed pages, gathered without a Python loop
+        begins = columns.indptr[active]
+        counts = columns.indptr[active + 1] - begins
+        positions = (np.repeat(begins - np.cumsum(counts) + counts, counts)
+                     + np.arange(counts.sum()))
+        targets, inverse = np.unique(columns.indices[positions],
+                                     return_inverse=True)
+        before = np.abs(residual[targets]).sum()
+        residual[targets] += damping * np.bincount(
+            inverse, weights=columns.data[positions] * np.repeat(
+                pushed, counts
+            )
+        )
+        remaining += np.abs(residual[targets]).sum() - before
+        active = targets
+    return ranks / ranks.sum(), pushes
+
+
+if __name__ == "__main__":
+    main()
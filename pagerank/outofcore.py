@@ -0,0 +1,146 @@
+import argparse
+import os
+import time
+
+import numpy as np
+
+from engine import DAMPING, TOLERANCE, MAX_ITERATIONS
+
+# Edges read from the file at a time, 32 MiB of int32 pairs
+CHUNK = 1 << 22
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Rank pages from a binary edge file without "
+                    "loading it into memory."
+    )
+    parser.add_argument("edges", help="file of sorted int32 "
+                        "(source, destination) pairs")
+    parser.add_argument("--pages", type=int, default=None,
+                        help="number of pages (default: largest id + 1)")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    edges = EdgeFile(args.edges, args.pages)
+    ranks, iterations = pagerank(edges, DAMPING, args.tolerance)
+    seconds = time.perf_counter() - start
+    print(f"{edges.pages} pages, {len(edges)} links, "
+          f"{iterations} iterations in {seconds:.2f}s")
+    for page in np.argsort(ranks)[::-1][:args.top]:
+        print(f"  {page}: {ranks[page]:.6f}")
+
+
+def write_edges(filename, sources, targets):
+    """
+    Writes links from pages `sources` to pages `targets`, given by
+    index, as an edge file: int32 (source, destination) pairs sorted
+    by source, then destination.
+    """
+    sources = np.asarray(sources, dtype=np.int32)
+    targets = np.asarray(targets, dtype=np.int32)
+    order = np.lexsort((targets, sources))
+    pairs = np.empty((len(order), 2), dtype=np.int32)
+    pairs[:, 0] = sources[order]
+    pairs[:, 1] = targets[order]
+    pairs.tofile(filename)
+
+
+def write_corpus(filename, corpus):
+    """
+    Writes a corpus as an edge file, returning the list of pages in
+    the order of their indices.
+    """
+    pages = list(corpus)
+    index = {page: i for i, page in enumerate(pages)}
+    write_edges(
+        filename,
+        [index[page] for page in pages for _ in corpus[page]],
+        [index[link] for page in pages for link in corpus[page]]
+    )
+    return pages
+
+
+class EdgeFile():
+    """
+    Edge file opened as a memory map, so that the operating system
+    pages links in as they are read and the file can be far larger
+    than memory.
+    """
+
+    def __init__(self, filename, pages=None, chunk=CHUNK):
+        if os.path.getsize(filename) == 0:
+            # An empty file cannot be memory mapped
+            self.edges = np.empty((0, 2), dtype=np.int32)
+        else:
+            self.edges = np.memmap(filename, dtype=np.int32, mode="r")
+            self.edges = self.edges.reshape(-1, 2)
+        self.chunk = chunk
+
+        # One pass to count each page's links, and pages if not given
+        if pages is None:
+            pages = 0
+            for block in self.blocks():
+                pages = max(pages, int(block.max()) + 1)
+        if pages <= 0:
+            raise ValueError(f"no pages in {filename}; pass the number "
+                             "of pages if none have links")
+        self.pages = pages
+        self.out_degree = np.zeros(pages, dtype=np.int64)
+        for block in self.blocks():
+            if len(block) and (block.min() < 0 or block.max() >= pages):
+                raise ValueError(f"page ids in {filename} must be from 0 "
+                                 f"to {pages - 1}; pass a larger number "
+                                 "of pages")
+            self.out_degree += np.bincount(block[:, 0], minlength=pages)
+
+    def __len__(self):
+        return len(self.edges)
+
+    def blocks(self):
+        """Yields the edges `chunk` pairs at a time, in file order."""
+        for start in range(0, len(self.edges), self.chunk):
+            yield np.asarray(self.edges[start:start + self.chunk])
+
+
+def pagerank(edges, damping=DAMPING, tolerance=TOLERANCE,
+             max_iterations=MAX_ITERATIONS):
+    """
+    Runs power iteration over an EdgeFile, streaming through the file
+    once per iteration. Only rank vectors and link counts, one entry
+    per page each, are held in memory. Pages with no links are
+    treated as linking to every page.
+
+    Returns the rank vector and the number of iterations run.
+    """
+    n = edges.pages
+    linked = edges.out_degree > 0
+    inverse_degree = np.zeros(n)
+    inverse_degree[linked] = 1 / edges.out_degree[linked]
+
+    ranks = np.full(n, 1 / n)
+    for iteration in range(1, max_iterations + 1):
+        # Each page passes its rank evenly along its links
+        shares = ranks * inverse_degree
+        new_ranks = np.zeros(n)
+        for block in edges.blocks():
+            new_ranks += np.bincount(block[:, 1],
+                                     weights=shares[block[:, 0]],
+                                     minlength=n)
+
+        dangling = ranks[~linked].sum()
+        new_ranks += dangling / n
+        new_ranks *= damping
+        new_ranks += (1 - damping) / n
+
+        change = np.abs(new_ranks - ranks).sum()
+        ranks = new_ranks
+        if change <= tolerance:
+            break
+    return ranks, iteration
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import sys
+
+import numpy as np
+from scipy import sparse
+
+from engine import LinkGraph, DAMPING, TOLERANCE, MAX_ITERATIONS
+from pagerank import crawl
+
+# Personalizations solved together in one block power iteration
+BLOCK = 64
+
+
+def main():
+    if len(sys.argv) < 3:
+        sys.exit("Usage: python personalized.py corpus page[,page...] ...")
+    graph = LinkGraph.from_corpus(crawl(sys.argv[1]))
+    seed_sets = [seeds.split(",") for seeds in sys.argv[2:]]
+    ranks, iterations = personalized_pagerank(
+        graph, teleport_matrix(graph, seed_sets)
+    )
+    for seeds, column in zip(seed_sets, ranks.T):
+        print(f"PageRank Results Teleporting to {', '.join(seeds)}")
+        for page, rank in sorted(graph.ranks(column).items()):
+            print(f"  {page}: {rank:.4f}")
+    print(f"Converged in {iterations.max()} iterations")
+
+
+def teleport_matrix(graph, seed_sets):
+    """
+    Returns a sparse N x K matrix whose kth column teleports uniformly
+    to the pages in the kth set of seed pages, such as the pages a
+    user has visited or the pages on a topic.
+    """
+    rows, columns, values = [], [], []
+    for k, seeds in enumerate(seed_sets):
+        seeds = set(seeds)
+        if not seeds:
+            raise ValueError(f"seed set {k} is empty")
+        rows.extend(graph.index[page] for page in seeds)
+        columns.extend([k] * len(seeds))
+        values.extend([1 / len(seeds)] * len(seeds))
+    return sparse.csc_matrix((values, (rows, columns)),
+                             shape=(len(graph), len(seed_sets)))
+
+
+def personalized_pagerank(graph, teleports, damping=DAMPING,
+                          tolerance=TOLERANCE,
+                          max_iterations=MAX_ITERATIONS, block=BLOCK):
+    """
+    Computes one personalized PageRank vector for each column of the
+    N x K matrix `teleports`, dense or sparse, each column giving the
+    probabilities with which the surfer jumps to each page. A surfer
+    on a page with no links jumps the same way.
+
+    Columns are solved `block` at a time by block power iteration, so
+    that each iteration is one pass over the link graph for the whole
+    block rather than one pass per column. Each column stops once its
+    L1 change is at most `tolerance`.
+
+    Returns the N x K matrix of ranks, and each column's iteration
+    count.
+    """
+    teleports = sparse.csc_matrix(teleports, dtype=float)
+    if (np.any(teleports.data < 0)
+            or not np.allclose(teleports.sum(axis=0), 1)):
+        raise ValueError("teleport columns must be distributions")
+    links = damping * graph.matrix
+
+    k = teleports.shape[1]
+    ranks = np.empty((len(graph), k))
+    iterations = np.zeros(k, dtype=int)
+    for first in range(0, k, block):
+        columns = slice(first, min(first + block, k))
+        ranks[:, columns], iterations[columns] = block_iteration(
+            graph, links, teleports[:, columns], damping, tolerance,
+            max_iterations
+        )
+    return ranks, iterations
+
+
+def block_iteration(graph, links, teleports, damping, tolerance,
+                    max_iterations):
+    """
+    Runs power iteration on every column of the sparse matrix
+    `teleports` at once, with `links` the graph's transition matrix
+    already scaled by `damping`. Converged columns drop out of later
+    iterations.
+    """
+    ranks = teleports.toarray()
+    iterations = np.zeros(teleports.shape[1], dtype=int)
+    # Columns still converging, compacted as others finish
+    active = np.arange(teleports.shape[1])
+    current = ranks.copy()
+    jumps = teleports.tocoo()
+    for iteration in range(1, max_iterations + 1):
+        # Teleports only touch the seed pages, so they are added
+        # entry by entry rather than as a dense matrix
+        dangling = current[graph.dangling].sum(axis=0)
+        scale = damping * dangling + (1 - damping)
+        new_ranks = links @ current
+        new_ranks[jumps.row, jumps.col] += jumps.data * scale[jumps.col]
+
+        # Reuse the old ranks' memory to measure the change
+        np.subtract(current, new_ranks, out=current)
+        np.abs(current, out=current)
+        change = current.sum(axis=0)
+        current = new_ranks
+
+        finished = change <= tolerance
+        if iteration == max_iterations:
+            finished[:] = True
+        if finished.any():
+            ranks[:, active[finished]] = current[:, finished]
+            iterations[active[finished]] = iteration
+            active = active[~finished]
+            current = current[:, ~finished]
+            jumps = teleports[:, active].tocoo()
+        if len(active) == 0:
+            break
+    return ranks, iterations
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+import argparse
+import multiprocessing
+import os
+import random
+import time
+from statistics import NormalDist
+
+import numpy as np
+
+from pagerank import crawl, link_lists, random_walk, DAMPING
+
+# Samples taken by each walker, and bounds on the number of walkers
+BATCH = 10000
+MIN_WALKERS = 10
+MAX_SAMPLES = 10_000_000
+
+# Set in each worker process by init_worker
+worker_links = None
+worker_damping = None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Estimate PageRank with random walkers in parallel."
+    )
+    parser.add_argument("corpus")
+    parser.add_argument("--tolerance", type=float, default=0.002,
+                        help="largest confidence interval half-width")
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--batch", type=int, default=BATCH,
+                        help="samples taken by each walker")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--processes", type=int, default=None,
+                        help="worker processes (default: all cores)")
+    args = parser.parse_args()
+
+    result = parallel_pagerank(
+        crawl(args.corpus), DAMPING, tolerance=args.tolerance,
+        confidence=args.confidence, batch=args.batch, seed=args.seed,
+        processes=args.processes
+    )
+    print(f"PageRank Results from {result['walkers']} Walkers "
+          f"(n = {result['samples']}, "
+          f"{args.confidence:.0%} confidence)")
+    for page in sorted(result["ranks"]):
+        low, high = result["intervals"][page]
+        print(f"  {page}: {result['ranks'][page]:.4f} "
+              f"[{low:.4f}, {high:.4f}]")
+    converged = "converged" if result["converged"] else "did not converge"
+    print(f"{converged} in {result['seconds']:.2f}s on "
+          f"{result['processes']} processes, "
+          f"{result['samples_per_second_per_core']:,.0f} samples/s/core")
+
+
+def init_worker(links, damping):
+    global worker_links, worker_damping
+    worker_links = links
+    worker_damping = damping
+
+
+def walk(task):
+    """
+    Runs one walker from a random page for a `(seed, samples)` task
+    and returns its visit counts.
+    """
+    seed, samples = task
+    counts = random_walk(worker_links, worker_damping, samples,
+                         random.Random(seed))
+    return np.array(counts, dtype=np.int32)
+
+
+def parallel_pagerank(corpus, damping_factor, tolerance=0.002,
+                      confidence=0.95, batch=BATCH, seed=0,
+                      processes=None, max_samples=MAX_SAMPLES):
+    """
+    Estimates PageRank with independent walkers of `batch` samples
+    each, seeded `seed`, `seed + 1`, ..., spread across a pool of
+    processes.
+
+    Each walker's visit frequencies are one estimate of the ranks, so
+    their spread gives a confidence interval for every page. Walkers
+    stop being started once every interval's half-width is at most
+    `tolerance`, or once `max_samples` samples have been taken.
+
+    Returns a dict with the ranks, the interval around each rank, and
+    the samples, walkers and time taken.
+    """
+    pages, links = link_lists(corpus)
+    processes = processes or os.cpu_count() or 1
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    tasks = [(seed + n, batch) for n in range(max(1, max_samples // batch))]
+
+    # Running sums of each walker's frequencies and their squares
+    total = np.zeros(len(pages))
+    total_squares = np.zeros(len(pages))
+    walkers = 0
+    converged = False
+
+    start = time.perf_counter()
+    with multiprocessing.Pool(processes, initializer=init_worker,
+                              initargs=(links, damping_factor)) as pool:
+        for counts in pool.imap_unordered(walk, tasks):
+            frequencies = counts / batch
+            total += frequencies
+            total_squares += frequencies * frequencies
+            walkers += 1
+            half_width = interval_half_width(total, total_squares,
+                                             walkers, z)
+            if walkers >= MIN_WALKERS and half_width.max() <= tolerance:
+                converged = True
+                break
+    seconds = time.perf_counter() - start
+
+    ranks = total / walkers
+    samples = walkers * batch
+    return {
+        "ranks": dict(zip(pages, ranks.tolist())),
+        "intervals": {
+            page: (rank - width, rank + width) for page, rank, width
+            in zip(pages, ranks.tolist(), half_width.tolist())
+        },
+        "converged": converged,
+        "walkers": walkers,
+        "samples": samples,
+        "seconds": seconds,
+        "processes": processes,
+        "samples_per_second_per_core": samples / seconds / processes,
+    }
+
+
+def interval_half_width(total, total_squares, walkers, z):
+    """
+    Returns the half-width of each page's confidence interval, from
+    the sums of `walkers` walkers' frequencies and squared frequencies.
+    """
+    if walkers < 2:
+        return np.full(len(total), np.inf)
+    mean = total / walkers
+    variance = (total_squares - walkers * mean * mean) / (walkers - 1)
+    return z * np.sqrt(np.maximum(variance, 0) / walkers)
+
+
+if __name__ == "__main__":
+    main()